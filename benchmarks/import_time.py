@@ -0,0 +1,77 @@
+"""
+Import time regression check for the `res-extract` CLI.
+
+Runs short CLI invocations under `python -X importtime` and fails if any
+of them imports a heavy dependency, or spends more than the budget on
+imports in total.
+
+    python benchmarks/import_time.py [--budget-ms 100]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# These should only be imported once a code path actually needs them
+HEAVY_MODULES = {"PIL", "pe_tools", "grope", "fs", "numpy", "multiprocessing"}
+
+INVOCATIONS = [
+    ["-m", "res_extract", "--help"],
+    ["-m", "res_extract", "images", "--help"],
+    ["-m", "res_extract", "export", "--help"],
+    ["-m", "res_extract", "icon-dupes", "--help"],
+    ["-m", "res_extract", "diskettes", "--help"],
+    ["-m", "res_extract", "expand", "--help"],
+]
+
+
+def measure(args: list[str]) -> tuple[int, set[str]]:
+    """
+    Return the total import time (in microseconds) and the set of
+    top-level packages imported by running Python with `args`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    total_us = 0
+    packages = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():  # The header line
+            continue
+        total_us += int(self_us)
+        packages.add(name.strip().split(".")[0])
+    return total_us, packages
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100,
+        help="maximum total import time per invocation (default: %(default)s)",
+    )
+    args = ap.parse_args()
+    failed = False
+    for invocation in INVOCATIONS:
+        total_us, packages = measure(invocation)
+        heavy = sorted(packages & HEAVY_MODULES)
+        command = " ".join(invocation)
+        print(f"{command}: {total_us / 1000:.1f} ms of imports")
+        if heavy:
+            print(f"  FAIL: imported {', '.join(heavy)}")
+            failed = True
+        if total_us / 1000 > args.budget_ms:
+            print(f"  FAIL: over budget of {args.budget_ms} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# Kept for compatibility; see `res-extract export`.
+from res_extract.commands.export import (  # noqa: F401
+    describe_resource,
+    export_resources,
+    main,
+)
+
+if __name__ == "__main__":
+    main()
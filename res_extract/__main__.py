@@ -0,0 +1,3 @@
+from res_extract.cli import main
+
+main()
@@ -0,0 +1,102 @@
+"""
+Asyncio API for extracting images from executables.
+
+    async for image in extract("EXCEL.EXE", kinds=("ico",)):
+        print(image.name, len(image.png))
+
+Parsing and decoding are CPU-bound, so they're run in an executor
+(the loop's default thread pool unless one is given) to keep the
+event loop responsive.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import io
+import os
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import Executor
+from typing import Union
+
+from res_extract.images import (
+    IMAGE_KINDS,
+    OUTPUT_FORMATS,
+    ExtractedImage,
+    ImageSource,
+    decode_image_source,
+    iter_image_sources,
+    validate_kinds,
+)
+from res_extract.resources import get_resources_from_file
+
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+
+def read_image_sources(
+    source: Source,
+    kinds: Iterable[str] = IMAGE_KINDS,
+) -> list[ImageSource]:
+    """
+    Read the resources of `source` (a path or the file's contents) and
+    gather the image sources found within.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        resources = list(get_resources_from_file(io.BytesIO(source)))
+    else:
+        with open(source, "rb") as fp:
+            resources = list(get_resources_from_file(fp))
+    return list(iter_image_sources(resources, kinds=kinds))
+
+
+def _decode_image_source(source: ImageSource, output: str) -> list[ExtractedImage]:
+    # Positional wrapper, since run_in_executor doesn't pass keyword arguments
+    return decode_image_source(source, output=output)
+
+
+async def extract(
+    source: Source,
+    *,
+    kinds: Iterable[str] = IMAGE_KINDS,
+    output: str = "png",
+    executor: Executor | None = None,
+    concurrency: int = 4,
+) -> AsyncIterator[ExtractedImage]:
+    """
+    Extract images from `source`, yielding them in resource order.
+
+    `kinds` selects which of "bmp", "ico" and "cur" to extract.  With
+    `output="png"`, images are returned as PNG bytes (`.png`); with
+    `output="pil"`, as PIL images (`.image`).  At most `concurrency`
+    resources are decoded at a time.
+    """
+    kinds = validate_kinds(kinds)
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output!r}")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if isinstance(source, (bytearray, memoryview)):
+        # Process pool executors can't pickle memoryviews
+        source = bytes(source)
+    loop = asyncio.get_running_loop()
+    sources = await loop.run_in_executor(executor, read_image_sources, source, kinds)
+    pending: collections.deque[asyncio.Future] = collections.deque()
+    try:
+        for image_source in sources:
+            pending.append(
+                loop.run_in_executor(
+                    executor,
+                    _decode_image_source,
+                    image_source,
+                    output,
+                ),
+            )
+            if len(pending) >= concurrency:
+                for image in await pending.popleft():
+                    yield image
+        while pending:
+            for image in await pending.popleft():
+                yield image
+    finally:
+        # If the caller stopped iterating early, don't leave work queued
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,70 @@
+"""
+Pack images into sprite atlases.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class AtlasRect:
+    atlas: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def pack_shelves(
+    sizes: list[tuple[int, int]],
+    *,
+    max_size: int = 2048,
+) -> list[AtlasRect]:
+    """
+    Pack rectangles of the given (width, height) sizes into atlases.
+
+    Uses a simple shelf packer: rectangles are placed tallest first, left
+    to right, and a new shelf is started when the current one is full.
+    When an atlas would grow beyond `max_size`, a new atlas is started.
+    A rectangle wider or taller than `max_size` gets an atlas of its own.
+
+    Returns one AtlasRect per input size, in input order.
+    """
+    if max_size < 1:
+        raise ValueError("max_size must be positive")
+    rects: list[AtlasRect | None] = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    atlas = 0
+    x = y = shelf_height = 0
+    for i in order:
+        width, height = sizes[i]
+        oversized = width > max_size or height > max_size
+        if x + width > max_size and x > 0:  # Start a new shelf...
+            y += shelf_height
+            x = shelf_height = 0
+        if (y + height > max_size or oversized) and (x > 0 or y > 0):
+            # ... or a new atlas
+            atlas += 1
+            x = y = shelf_height = 0
+        rects[i] = AtlasRect(atlas=atlas, x=x, y=y, width=width, height=height)
+        if oversized:  # Nothing goes next to it
+            atlas += 1
+            x = y = shelf_height = 0
+        else:
+            x += width
+            shelf_height = max(shelf_height, height)
+    return rects
+
+
+def get_atlas_sizes(rects: list[AtlasRect]) -> list[tuple[int, int]]:
+    """
+    Get the (width, height) each atlas needs to hold its rectangles.
+    """
+    sizes: dict[int, tuple[int, int]] = {}
+    for rect in rects:
+        width, height = sizes.get(rect.atlas, (0, 0))
+        sizes[rect.atlas] = (
+            max(width, rect.x + rect.width),
+            max(height, rect.y + rect.height),
+        )
+    return [sizes[atlas] for atlas in sorted(sizes)]
@@ -0,0 +1,42 @@
+"""
+The `res-extract` command line entry point.
+"""
+import argparse
+import importlib
+
+COMMANDS = {
+    "images": "res_extract.commands.images",
+    "export": "res_extract.commands.export",
+    "icon-dupes": "res_extract.commands.icon_dupes",
+    "diskettes": "res_extract.commands.diskettes",
+    "expand": "res_extract.commands.expand",
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="res-extract",
+        description="resource extraction tools",
+    )
+    command_parsers = {}
+    subparsers = ap.add_subparsers(dest="command", metavar="command", required=True)
+    for name, module_name in COMMANDS.items():
+        module = importlib.import_module(module_name)
+        command_ap = subparsers.add_parser(
+            name,
+            help=module.DESCRIPTION,
+            description=module.DESCRIPTION,
+        )
+        module.add_arguments(command_ap)
+        command_ap.set_defaults(run=module.run)
+        command_parsers[name] = (module, command_ap)
+    args = ap.parse_args(argv)
+    module, command_ap = command_parsers[args.command]
+    # Commands may check argument combinations argparse can't express
+    if hasattr(module, "check_arguments"):
+        module.check_arguments(command_ap, args)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
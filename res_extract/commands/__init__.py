@@ -0,0 +1,7 @@
+"""
+Subcommands of the `res-extract` CLI.
+
+Each module exposes `DESCRIPTION`, `add_arguments(parser)` and `run(args)`
+(and a standalone `main()`).  Keep their top-level imports light; heavy
+dependencies should be imported where they're actually needed.
+"""
@@ -0,0 +1,46 @@
+"""
+Extract the files off FAT diskette images.
+"""
+import argparse
+import os
+import shutil
+import sys
+
+DESCRIPTION = "extract diskette images into a directory using pyfatfs"
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("image", nargs="+")
+    ap.add_argument("-d", "--dir", required=True, help="output directory")
+
+
+def run(args: argparse.Namespace):
+    from fs import open_fs
+
+    os.makedirs(args.dir, exist_ok=True)
+    for image_filename in args.image:
+        with open_fs(f"fat://{image_filename}") as fs:
+            for file in fs.walk.files():
+                dest_path = os.path.join(args.dir, file.removeprefix("/"))
+                with fs.open(file, "rb") as inf:
+                    with open(dest_path, "wb") as outf:
+                        shutil.copyfileobj(inf, outf)
+                        print(
+                            f"{image_filename}#{file} => {dest_path}, {outf.tell()} bytes",
+                            file=sys.stderr,
+                        )
+                    try:
+                        fi = fs.getinfo(file)
+                        os.utime(dest_path, (fi.modified, fi.modified))
+                    except Exception:
+                        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(ap)
+    run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Export resource metadata, string tables and version info as JSON lines.
+"""
+import argparse
+import codecs
+import hashlib
+import json
+import logging
+import os
+import sys
+from collections.abc import Iterable
+
+from res_extract.errors import ParseError
+from res_extract.resource_types import KnownResourceTypes
+from res_extract.resources import ResourceEntry, get_resources_from_file
+from res_extract.strings import decode_string_table
+
+log = logging.getLogger(__name__)
+
+DESCRIPTION = "export resource metadata, string tables and version info as JSON lines"
+# SHAKE digests are variable-length, so `hexdigest()` would need a length
+HASH_ALGORITHMS = sorted(
+    name for name in hashlib.algorithms_guaranteed if not name.startswith("shake_")
+)
+
+
+def describe_resource(
+    r: ResourceEntry,
+    *,
+    hash_algorithm: str = "sha256",
+    ne_encoding: str = "cp1252",
+) -> dict:
+    """
+    Describe a single resource as a JSON-friendly dict.
+
+    String tables and version info blocks are decoded as well.
+    """
+    record = {
+        "type_id": r.type_id,
+        "type": r.type,
+        "res_id": r.res_id,
+        "name": r.name,
+        "lang_id": r.lang_id,
+        "format": r.exe_format,
+        "size": len(r.data),
+        hash_algorithm: hashlib.new(hash_algorithm, r.data).hexdigest(),
+    }
+    if not r.has_windows_types:
+        return record
+    try:
+        if r.type_id == KnownResourceTypes.RT_STRING:
+            record["strings"] = {
+                str(string_id): string
+                for (string_id, string) in decode_string_table(
+                    r,
+                    ne_encoding=ne_encoding,
+                ).items()
+            }
+        elif r.type_id == KnownResourceTypes.RT_VERSION:
+            from res_extract.version_info import parse_version_info
+
+            record["version_info"] = parse_version_info(r, ne_encoding=ne_encoding)
+    except ParseError as exc:
+        record["error"] = str(exc)
+    return record
+
+
+def export_resources(
+    *,
+    source_file,
+    source_name: str,
+    hash_algorithm: str = "sha256",
+    ne_encoding: str = "cp1252",
+) -> Iterable[dict]:
+    for r in get_resources_from_file(source_file):
+        record = describe_resource(
+            r,
+            hash_algorithm=hash_algorithm,
+            ne_encoding=ne_encoding,
+        )
+        yield {"file": source_name, **record}
+
+
+def _encoding(value: str) -> str:
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise argparse.ArgumentTypeError(f"unknown encoding {value!r}") from None
+    return value
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("file", nargs="+")
+    ap.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="output file (default: stdout)",
+    )
+    ap.add_argument("--continue-on-errors", default=False, action="store_true")
+    ap.add_argument(
+        "--hash",
+        default="sha256",
+        choices=HASH_ALGORITHMS,
+        help="hash algorithm for resource data (default: %(default)s)",
+    )
+    ap.add_argument(
+        "--ne-encoding",
+        type=_encoding,
+        default="cp1252",
+        help="encoding for 16-bit string tables and version info (default: %(default)s)",
+    )
+    ap.add_argument("--debug", default=False, action="store_true")
+
+
+def run(args: argparse.Namespace):
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG)
+    if args.output == "-":
+        outf = sys.stdout
+    else:
+        outf = open(args.output, "w", encoding="utf-8")
+    try:
+        for source_file in args.file:
+            if os.path.getsize(source_file) == 0:
+                log.warning("%s: empty file", source_file)
+                continue
+            try:
+                with open(source_file, "rb") as fin:
+                    for record in export_resources(
+                        source_file=fin,
+                        source_name=source_file,
+                        hash_algorithm=args.hash,
+                        ne_encoding=args.ne_encoding,
+                    ):
+                        outf.write(json.dumps(record, ensure_ascii=False))
+                        outf.write("\n")
+            except ParseError as exc:
+                log.warning("%s: %s", source_file, exc)
+            except BrokenPipeError:
+                raise
+            except Exception:
+                if args.continue_on_errors:
+                    log.exception(f"Failed exporting from {source_file}", exc_info=True)
+                else:
+                    print("Error while exporting", source_file, file=sys.stderr)
+                    raise
+    except BrokenPipeError:
+        # Downstream stopped reading (e.g. `| head`); that's fine, but
+        # keep Python from complaining again when flushing at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if outf is not sys.stdout:
+            outf.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(ap)
+    run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    main()
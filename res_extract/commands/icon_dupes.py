@@ -0,0 +1,140 @@
+"""
+Find near-duplicate icons and cursors across many files by perceptual hashing.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from res_extract.errors import ParseError
+from res_extract.resources import get_resources_from_file
+
+log = logging.getLogger(__name__)
+
+DESCRIPTION = "find near-duplicate icon/cursor frames across files (requires numpy)"
+
+
+def add_frames_from_file(builder, source_file, source_name: str):
+    from res_extract.images import iter_images
+
+    resources = list(get_resources_from_file(source_file))
+    for image in iter_images(resources, kinds=("ico", "cur"), output="pil"):
+        builder.add(source_name, image.name, image.image)
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("file", nargs="*", help="executables to hash frames from")
+    ap.add_argument(
+        "--load-index",
+        action="append",
+        default=[],
+        help="previously saved index(es) to include (may be repeated)",
+    )
+    ap.add_argument(
+        "--save-index",
+        help="save the hash index here (.npz is appended if missing)",
+    )
+    ap.add_argument(
+        "--hash",
+        choices=("dhash", "phash"),
+        help="perceptual hash to use for new files (default: that of the loaded indexes, or dhash)",
+    )
+    ap.add_argument(
+        "--max-distance",
+        type=int,
+        default=4,
+        help="maximum Hamming distance (of 64 bits) between near-duplicates (default: %(default)s)",
+    )
+    ap.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="where to write duplicate groups as JSON lines (default: stdout)",
+    )
+    ap.add_argument("--continue-on-errors", default=False, action="store_true")
+    ap.add_argument("--debug", default=False, action="store_true")
+
+
+def check_arguments(ap: argparse.ArgumentParser, args: argparse.Namespace):
+    if not (args.file or args.load_index):
+        ap.error("nothing to do: give files and/or --load-index")
+    if args.load_index:
+        from res_extract.icon_hashes import read_index_hash_kind
+
+        hash_kinds = set()
+        for path in args.load_index:
+            try:
+                hash_kinds.add(read_index_hash_kind(path))
+            except (OSError, ValueError, KeyError) as exc:
+                ap.error(f"can't read index {path}: {exc}")
+        if len(hash_kinds) > 1:
+            ap.error(f"can't mix indexes of hash kinds {sorted(hash_kinds)}")
+        (hash_kind,) = hash_kinds
+        if args.hash is None:
+            args.hash = hash_kind
+        elif args.file and args.hash != hash_kind:
+            ap.error(f"--hash {args.hash} doesn't match the loaded {hash_kind} index")
+
+
+def run(args: argparse.Namespace):
+    from res_extract.icon_hashes import (
+        IconHashIndex,
+        IconHashIndexBuilder,
+        group_near_duplicates,
+    )
+
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG)
+    indexes = [IconHashIndex.load(path) for path in args.load_index]
+    if args.file:
+        builder = IconHashIndexBuilder(hash_kind=args.hash or "dhash")
+        for source_file in args.file:
+            if os.path.getsize(source_file) == 0:
+                log.warning("%s: empty file", source_file)
+                continue
+            try:
+                with open(source_file, "rb") as fin:
+                    add_frames_from_file(builder, fin, source_file)
+            except ParseError as exc:
+                log.warning("%s: %s", source_file, exc)
+            except Exception:
+                if args.continue_on_errors:
+                    log.exception(f"Failed hashing {source_file}", exc_info=True)
+                else:
+                    print("Error while hashing", source_file, file=sys.stderr)
+                    raise
+        indexes.append(builder.build())
+    index = IconHashIndex.concatenate(indexes)
+    print(f"{len(index)} frames in index", file=sys.stderr)
+    if args.save_index:
+        index_path = index.save(args.save_index)
+        print(f"Index saved to {index_path}", file=sys.stderr)
+
+    if args.output == "-":
+        outf = sys.stdout
+    else:
+        outf = open(args.output, "w", encoding="utf-8")
+    try:
+        for group in group_near_duplicates(index.hashes, args.max_distance):
+            record = {
+                "size": len(group),
+                "members": [index.describe(i) for i in group],
+            }
+            outf.write(json.dumps(record))
+            outf.write("\n")
+    finally:
+        if outf is not sys.stdout:
+            outf.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(ap)
+    args = ap.parse_args()
+    check_arguments(ap, args)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
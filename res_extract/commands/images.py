@@ -0,0 +1,403 @@
+"""
+Extract images and icons from executables.
+
+Pillow (and pe_tools, for icons) are imported only once there's
+something to decode, so e.g. `--help` stays fast.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+
+from res_extract.errors import ParseError
+from res_extract.resource_types import KnownResourceTypes
+from res_extract.resources import get_resources_from_file
+
+log = logging.getLogger(__name__)
+
+DESCRIPTION = "extract images and icons from PE/NE/LE files"
+
+
+def extract_images(
+    *,
+    dest_dir: str,
+    source_file,
+    extract_ico: bool,
+    extract_png: bool,
+    name_prefix: str = "",
+    log_prefix: str,
+    atlas: bool = False,
+    atlas_size: int = 2048,
+    write_ico_image=None,
+):
+    write_ico_image = write_ico_image or _write_ico_image
+    resources = [
+        r
+        for r in get_resources_from_file(source_file)
+        if r.has_windows_types  # We don't know how to decode OS/2 images
+    ]
+    atlas_frames = []
+    for r in resources:
+        if r.type_id == KnownResourceTypes.RT_BITMAP:
+            from PIL import Image
+
+            # Here's hoping DibImageFile can handle this!
+            img = Image.open(io.BytesIO(r.data))
+            img.load()
+            if extract_png:
+                png_path = os.path.join(
+                    dest_dir, f"{name_prefix}bmp_{r.filename_part}.png"
+                )
+                img.save(png_path)
+                print(log_prefix, "=>", png_path)
+
+    type_ids = {r.type_id for r in resources}
+    if not (
+        KnownResourceTypes.RT_GROUP_ICON in type_ids
+        or KnownResourceTypes.RT_GROUP_CURSOR in type_ids
+    ):
+        return
+
+    from res_extract import icons as libicons
+
+    for r, ico_data in libicons.extract_icons(resources):
+        write_ico_image(
+            ico_data=ico_data,
+            dest_dir=dest_dir,
+            extract_ico=extract_ico,
+            extract_png=extract_png and not atlas,
+            name=f"{name_prefix}ico_{r.filename_part}",
+            log_prefix=log_prefix,
+        )
+        if atlas:
+            _collect_atlas_frames(atlas_frames, ico_data, "ico", r.filename_part)
+
+    for r, cur_data in libicons.extract_cursors(resources):
+        write_ico_image(
+            ico_data=cur_data,
+            dest_dir=dest_dir,
+            extract_ico=extract_ico,
+            extract_png=extract_png and not atlas,
+            name=f"{name_prefix}cur_{r.filename_part}",
+            log_prefix=log_prefix,
+            ico_extension=".cur",
+        )
+        if atlas:
+            _collect_atlas_frames(atlas_frames, cur_data, "cur", r.filename_part)
+
+    if atlas_frames:
+        _write_atlases(
+            frames=atlas_frames,
+            dest_dir=dest_dir,
+            name=f"{name_prefix}atlas",
+            atlas_size=atlas_size,
+            log_prefix=log_prefix,
+        )
+
+
+def _collect_atlas_frames(frames: list, ico_data: bytes, kind: str, filename_part: str):
+    from PIL import Image
+
+    from res_extract.images import iter_ico_frames
+
+    img = Image.open(io.BytesIO(ico_data))
+    for suffix, frame in iter_ico_frames(img):
+        frames.append(
+            {
+                "name": f"{kind}_{filename_part}{suffix}",
+                "kind": kind,
+                "resource": filename_part,
+                "image": frame.convert("RGBA"),
+            },
+        )
+
+
+def _write_atlases(
+    *,
+    frames: list,
+    dest_dir: str,
+    name: str,
+    atlas_size: int,
+    log_prefix: str,
+):
+    """
+    Pack icon/cursor frames into atlas PNGs and write a JSON sidecar
+    mapping each frame to its rectangle.
+    """
+    from PIL import Image
+
+    from res_extract.atlas import get_atlas_sizes, pack_shelves
+
+    rects = pack_shelves([f["image"].size for f in frames], max_size=atlas_size)
+    atlases = [Image.new("RGBA", size) for size in get_atlas_sizes(rects)]
+    for frame, rect in zip(frames, rects):
+        atlases[rect.atlas].paste(frame["image"], (rect.x, rect.y))
+    atlas_filenames = []
+    for i, atlas_img in enumerate(atlases):
+        atlas_filename = f"{name}_{i}.png"
+        atlas_path = os.path.join(dest_dir, atlas_filename)
+        atlas_img.save(atlas_path, optimize=True)
+        atlas_filenames.append(atlas_filename)
+        print(log_prefix, "=>", atlas_path)
+    sidecar = {
+        "atlases": atlas_filenames,
+        "frames": [
+            {
+                "name": frame["name"],
+                "kind": frame["kind"],
+                "resource": frame["resource"],
+                "atlas": rect.atlas,
+                "x": rect.x,
+                "y": rect.y,
+                "width": rect.width,
+                "height": rect.height,
+            }
+            for frame, rect in zip(frames, rects)
+        ],
+    }
+    sidecar_path = os.path.join(dest_dir, f"{name}.json")
+    with open(sidecar_path, "w") as outf:
+        json.dump(sidecar, outf, indent=2)
+    print(log_prefix, "=>", sidecar_path)
+
+
+def _write_ico_image(
+    *,
+    ico_data: bytes,
+    dest_dir: str,
+    extract_ico: bool,
+    extract_png: bool,
+    ico_extension: str = ".ico",
+    name: str,
+    log_prefix: str,
+):
+    """
+    Write an ICO/CUR file.
+    """
+    if extract_ico:
+        ico_path = os.path.join(dest_dir, f"{name}{ico_extension}")
+        with open(ico_path, "wb") as outf:
+            outf.write(ico_data)
+            print(log_prefix, "=>", outf.name)
+    if extract_png:
+        from PIL import Image
+
+        from res_extract.images import iter_ico_frames
+
+        img = Image.open(io.BytesIO(ico_data))
+        print(img, img.info)
+        for suffix, frame in iter_ico_frames(img):
+            png_path = os.path.join(dest_dir, f"{name}{suffix}.png")
+            frame.save(png_path)
+            print(log_prefix, "=>", png_path)
+
+
+_payload_client = None
+
+
+def _init_ico_worker(release_queue, max_segments: int):
+    global _payload_client
+    from res_extract.shm import SharedPayloadClient
+
+    _payload_client = SharedPayloadClient(release_queue, max_segments=max_segments)
+
+
+def _write_ico_image_from_shm(handle, kwargs: dict):
+    try:
+        ico_data = _payload_client.read_bytes(handle)
+    finally:
+        _payload_client.release(handle)
+    _write_ico_image(ico_data=ico_data, **kwargs)
+
+
+class ParallelIcoWriter:
+    """
+    Drop-in for `_write_ico_image` that does the decoding, encoding and
+    writing in worker processes.  The ICO/CUR data is passed through
+    pooled shared memory; the workers only receive small handles.
+    """
+
+    def __init__(self, jobs: int):
+        import multiprocessing
+
+        from res_extract.shm import SharedPayloadPool
+
+        self.payloads = SharedPayloadPool()
+        self.pool = multiprocessing.Pool(
+            jobs,
+            initializer=_init_ico_worker,
+            initargs=(self.payloads.release_queue, self.payloads.max_segments),
+        )
+        self.pending = []
+        self.lost_tasks = False
+
+    def __call__(self, *, ico_data: bytes, **kwargs):
+        handle = self.payloads.put_bytes(ico_data)
+        self.pending.append(
+            self.pool.apply_async(_write_ico_image_from_shm, (handle, kwargs)),
+        )
+
+    def wait(self):
+        """
+        Wait for all submitted images to be written, then re-raise the
+        first worker error, if any.
+        """
+        import multiprocessing
+
+        pending, self.pending = self.pending, []
+        timeout = self.payloads.release_timeout
+        error = None
+        for result in pending:
+            try:
+                # A task whose worker died never completes, so don't wait forever
+                result.get(timeout=timeout)
+            except multiprocessing.TimeoutError:
+                self.lost_tasks = True
+                error = error or TimeoutError(
+                    f"an image wasn't written in {timeout} seconds; did a worker die?",
+                )
+            except Exception as exc:
+                error = error or exc
+        if error:
+            raise error
+
+    def close(self):
+        if self.lost_tasks:
+            # Joining would wait for the lost tasks forever
+            self.pool.terminate()
+        else:
+            self.pool.close()
+        self.pool.join()
+        self.payloads.close()
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be positive, not {number}")
+    return number
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("file", nargs="+")
+    ap.add_argument("-d", "--dir", required=True)
+    ap.add_argument("--continue-on-errors", default=False, action="store_true")
+    ap.add_argument(
+        "--ico",
+        default=False,
+        action="store_true",
+        help="extract icon/cursor resources as ico/cur",
+    )
+    ap.add_argument(
+        "--png",
+        default=False,
+        action="store_true",
+        help="extract image-like resources as png",
+    )
+    ap.add_argument(
+        "--atlas",
+        default=False,
+        action="store_true",
+        help="pack icon/cursor frames into atlas png(s) with a json sidecar, instead of one png per frame",
+    )
+    ap.add_argument(
+        "--atlas-size",
+        type=_positive_int,
+        default=2048,
+        help="maximum atlas width/height (default: %(default)s)",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        help="decode and write icons/cursors in this many worker processes (default: %(default)s)",
+    )
+    ap.add_argument("--process-images", default=False, action="store_true")
+    ap.add_argument("--debug", default=False, action="store_true")
+
+
+def run(args: argparse.Namespace):
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG)
+    dest_dir = args.dir
+    os.makedirs(dest_dir, exist_ok=True)
+    if not (args.ico or args.png or args.atlas):
+        print(
+            "Warning: none of --ico, --png or --atlas specified, nothing will be extracted",
+        )
+    ico_writer = ParallelIcoWriter(args.jobs) if args.jobs > 1 else None
+    try:
+        for source_file in args.file:
+            success = False
+            if os.path.getsize(source_file) == 0:
+                log.warning("%s: empty file", source_file)
+                continue
+            try:
+                with open(source_file, "rb") as fin:
+                    try:
+                        extract_images(
+                            dest_dir=dest_dir,
+                            source_file=fin,
+                            extract_ico=args.ico,
+                            extract_png=args.png,
+                            name_prefix=(
+                                f"{os.path.basename(source_file)}_"
+                                if len(args.file) > 1
+                                else ""
+                            ),
+                            log_prefix=source_file,
+                            atlas=args.atlas,
+                            atlas_size=args.atlas_size,
+                            write_ico_image=ico_writer,
+                        )
+                    finally:
+                        # Even if this file failed partway, settle what it
+                        # already submitted, so errors are blamed on it.
+                        if ico_writer:
+                            ico_writer.wait()
+                    success = True
+            except ParseError as exc:
+                log.warning("%s: %s", source_file, exc)
+            except Exception:
+                if args.continue_on_errors:
+                    log.exception(
+                        f"Failed extracting from {source_file}",
+                        exc_info=True,
+                    )
+                else:
+                    print("Error while extracting", source_file, file=sys.stderr)
+                    raise
+            if not success and args.process_images:
+                try:
+                    from PIL import Image
+
+                    im = Image.open(source_file)
+                    im.load()
+                    if args.png:
+                        dest_file = os.path.join(
+                            dest_dir,
+                            os.path.basename(source_file) + ".png",
+                        )
+                        im.save(dest_file)
+                        print(
+                            f"Image {source_file} ({im.size} {im.format}) converted to {dest_file}",
+                        )
+                except Exception as exc:
+                    log.warning("%s: not an image either: %s", source_file, exc)
+
+    finally:
+        if ico_writer:
+            ico_writer.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(ap)
+    run(ap.parse_args())
+
+
+if __name__ == "__main__":
+    main()
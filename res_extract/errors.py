@@ -9,5 +9,17 @@ class NotNEFile(ParseError):
     pass
 
 
+class NotLEFile(ParseError):
+    pass
+
+
 class BadResourceTable(ParseError):
     pass
+
+
+class BadStringTable(ParseError):
+    pass
+
+
+class BadVersionInfo(ParseError):
+    pass
@@ -0,0 +1,356 @@
+"""
+Perceptual hashing and near-duplicate grouping of icon/cursor frames.
+
+Requires NumPy.  Hashes are 64-bit (8x8 bits) dHashes or pHashes, kept
+in flat uint64 arrays so distances can be computed against a whole index
+at once with XOR and popcount.
+"""
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+HASH_SIZE = 8
+HASH_KINDS = ("dhash", "phash")
+# (width, height) the frames are scaled to before hashing
+HASH_IMAGE_SIZES = {
+    "dhash": (HASH_SIZE + 1, HASH_SIZE),
+    "phash": (HASH_SIZE * 4, HASH_SIZE * 4),
+}
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_u64_by_table(values: np.ndarray) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    by_byte = _POPCOUNT_TABLE[values.view(np.uint8)]
+    return by_byte.reshape(*values.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+    _popcount_u64 = np.bitwise_count
+else:
+    _popcount_u64 = _popcount_u64_by_table
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """
+    Count the set bits of each element of an uint64 array.
+    """
+    return _popcount_u64(values)
+
+
+def hamming_distances(hashes: np.ndarray, query: int) -> np.ndarray:
+    """
+    Compute the Hamming distance from `query` to every hash in `hashes`.
+    """
+    return popcount(np.bitwise_xor(hashes, np.uint64(query)))
+
+
+def pack_hash_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack a (N, 8, 8) boolean array into N uint64 hashes (first bit is the MSB).
+    """
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def dhash(pixels: np.ndarray) -> np.ndarray:
+    """
+    Difference hash a (N, 8, 9) batch of grayscale pixels:
+    each bit tells whether a pixel is brighter than its left neighbour.
+    """
+    pixels = pixels.astype(np.int16)
+    return pack_hash_bits(pixels[:, :, 1:] > pixels[:, :, :-1])
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    # Orthonormal DCT-II basis, so X -> D @ X @ D.T is a 2D DCT
+    k = np.arange(n)[:, np.newaxis]
+    i = np.arange(n)[np.newaxis, :]
+    matrix = np.cos(math.pi * (2 * i + 1) * k / (2 * n)) * math.sqrt(2 / n)
+    matrix[0] /= math.sqrt(2)
+    return matrix
+
+
+def phash(pixels: np.ndarray) -> np.ndarray:
+    """
+    Perceptual hash a (N, 32, 32) batch of grayscale pixels: each bit
+    tells whether a low-frequency DCT coefficient is above the median.
+    """
+    dct = _dct_matrix(pixels.shape[-1])
+    coefficients = dct @ pixels.astype(np.float64) @ dct.T
+    low = coefficients[:, :HASH_SIZE, :HASH_SIZE].reshape(len(pixels), -1)
+    # The DC term says nothing about structure; leave it out of the median
+    medians = np.median(low[:, 1:], axis=1, keepdims=True)
+    return pack_hash_bits(low > medians)
+
+
+HASH_FUNCTIONS = {
+    "dhash": dhash,
+    "phash": phash,
+}
+
+
+def prepare_frame(img, hash_kind: str) -> np.ndarray:
+    """
+    Flatten a (PIL) frame onto white, grayscale it and scale it for hashing.
+
+    Flattening makes frames that only differ in how their transparency
+    is expressed (alpha channel vs. AND mask) hash alike.
+    """
+    from PIL import Image
+
+    img = img.convert("RGBA")
+    background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+    background.alpha_composite(img)
+    scaled = background.convert("L").resize(
+        HASH_IMAGE_SIZES[hash_kind],
+        Image.Resampling.LANCZOS,
+    )
+    return np.asarray(scaled, dtype=np.uint8)
+
+
+def _npz_path(path: str) -> str:
+    return path if path.endswith(".npz") else f"{path}.npz"
+
+
+def resolve_index_path(path: str) -> str:
+    """
+    Find a saved index, which may have been saved without the .npz suffix.
+    """
+    if not os.path.exists(path):
+        path = _npz_path(path)
+    return path
+
+
+def read_index_hash_kind(path: str) -> str:
+    """
+    Read only the hash kind of a saved index.
+    """
+    with np.load(resolve_index_path(path)) as data:
+        return str(data["hash_kind"])
+
+
+@dataclass
+class IconHashIndex:
+    """
+    A compact index of frame hashes.
+
+    Each entry is 16 bytes: the hash, plus indices into the (deduplicated)
+    `files` and `names` tables.
+    """
+
+    hash_kind: str
+    hashes: np.ndarray  # uint64
+    file_ids: np.ndarray  # uint32, into `files`
+    name_ids: np.ndarray  # uint32, into `names`
+    files: list[str]
+    names: list[str]
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def describe(self, i: int) -> dict:
+        return {
+            "file": self.files[self.file_ids[i]],
+            "name": self.names[self.name_ids[i]],
+            "hash": f"{int(self.hashes[i]):016x}",
+        }
+
+    def save(self, path: str) -> str:
+        """
+        Save the index; ".npz" is appended to `path` if missing.
+        Returns the path actually written.
+        """
+        path = _npz_path(path)
+        np.savez(
+            path,
+            hash_kind=np.array(self.hash_kind),
+            hashes=self.hashes,
+            file_ids=self.file_ids,
+            name_ids=self.name_ids,
+            files=np.array(self.files, dtype=str),
+            names=np.array(self.names, dtype=str),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> IconHashIndex:
+        with np.load(resolve_index_path(path)) as data:
+            return cls(
+                hash_kind=str(data["hash_kind"]),
+                hashes=data["hashes"],
+                file_ids=data["file_ids"],
+                name_ids=data["name_ids"],
+                files=data["files"].tolist(),
+                names=data["names"].tolist(),
+            )
+
+    @classmethod
+    def concatenate(cls, indexes: list[IconHashIndex]) -> IconHashIndex:
+        hash_kinds = {index.hash_kind for index in indexes}
+        if len(hash_kinds) != 1:
+            raise ValueError(f"Can't mix indexes of hash kinds {sorted(hash_kinds)}")
+        files: list[str] = []
+        names: list[str] = []
+        file_ids = []
+        name_ids = []
+        for index in indexes:
+            file_ids.append(index.file_ids + len(files))
+            name_ids.append(index.name_ids + len(names))
+            files.extend(index.files)
+            names.extend(index.names)
+        return cls(
+            hash_kind=hash_kinds.pop(),
+            hashes=np.concatenate([index.hashes for index in indexes]),
+            file_ids=np.concatenate(file_ids).astype(np.uint32),
+            name_ids=np.concatenate(name_ids).astype(np.uint32),
+            files=files,
+            names=names,
+        )
+
+
+class IconHashIndexBuilder:
+    """
+    Accumulates frames and hashes them in batches.
+    """
+
+    def __init__(self, hash_kind: str = "dhash", batch_size: int = 4096):
+        if hash_kind not in HASH_KINDS:
+            raise ValueError(f"Unknown hash kind {hash_kind!r}")
+        self.hash_kind = hash_kind
+        self.batch_size = batch_size
+        self._hash_chunks: list[np.ndarray] = []
+        self._pending_pixels: list[np.ndarray] = []
+        self._file_ids = array("I")
+        self._name_ids = array("I")
+        self._files: dict[str, int] = {}
+        self._names: dict[str, int] = {}
+
+    def add(self, file: str, name: str, img):
+        self._pending_pixels.append(prepare_frame(img, self.hash_kind))
+        self._file_ids.append(self._files.setdefault(file, len(self._files)))
+        self._name_ids.append(self._names.setdefault(name, len(self._names)))
+        if len(self._pending_pixels) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending_pixels:
+            batch = np.stack(self._pending_pixels)
+            self._hash_chunks.append(HASH_FUNCTIONS[self.hash_kind](batch))
+            self._pending_pixels.clear()
+
+    def build(self) -> IconHashIndex:
+        self._flush()
+        return IconHashIndex(
+            hash_kind=self.hash_kind,
+            hashes=(
+                np.concatenate(self._hash_chunks)
+                if self._hash_chunks
+                else np.zeros(0, dtype=np.uint64)
+            ),
+            file_ids=np.array(self._file_ids, dtype=np.uint32),
+            name_ids=np.array(self._name_ids, dtype=np.uint32),
+            files=list(self._files),
+            names=list(self._names),
+        )
+
+
+def _band_layout(bands: int) -> list[tuple[int, int]]:
+    # Split the 64 hash bits into `bands` contiguous (shift, width) ranges
+    layout = []
+    shift = 0
+    for band in range(bands):
+        width = (64 - shift) // (bands - band)
+        layout.append((shift, width))
+        shift += width
+    return layout
+
+
+def _connected_components(n: int, edges_a: np.ndarray, edges_b: np.ndarray):
+    # Min-label propagation; each round is vectorised over all edges
+    labels = np.arange(n)
+    while True:
+        previous = labels
+        labels = labels.copy()
+        np.minimum.at(labels, edges_a, labels[edges_b])
+        np.minimum.at(labels, edges_b, labels[edges_a])
+        labels = labels[labels]  # Pointer jumping
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def find_near_duplicate_edges(
+    hashes: np.ndarray,
+    max_distance: int,
+    *,
+    chunk_size: int = 512,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find all pairs of (distinct) hashes within `max_distance` bits of each other.
+
+    Uses multi-index hashing: split into max_distance + 1 bands, any two
+    hashes within max_distance bits must agree exactly on at least one
+    band, so only hashes sharing a band value need to be compared.
+    """
+    edges_a = []
+    edges_b = []
+    bands = min(max_distance + 1, 64)
+    for shift, width in _band_layout(bands):
+        keys = (hashes >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+        order = np.argsort(keys, kind="stable")
+        run_starts = np.flatnonzero(np.diff(keys[order])) + 1
+        run_bounds = zip(
+            np.concatenate([[0], run_starts]),
+            np.concatenate([run_starts, [len(order)]]),
+        )
+        for start, end in run_bounds:
+            if end - start < 2:
+                continue
+            members = order[start:end]
+            values = hashes[members]
+            for chunk_start in range(0, len(members), chunk_size):
+                # Compare the chunk against itself and everything after it
+                chunk = values[chunk_start : chunk_start + chunk_size]
+                rest = values[chunk_start:]
+                distances = popcount(
+                    np.bitwise_xor(chunk[:, np.newaxis], rest[np.newaxis, :]),
+                )
+                ii, jj = np.nonzero(distances <= max_distance)
+                keep = ii < jj
+                edges_a.append(members[chunk_start + ii[keep]])
+                edges_b.append(members[chunk_start + jj[keep]])
+    if not edges_a:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.concatenate(edges_a), np.concatenate(edges_b)
+
+
+def group_near_duplicates(
+    hashes: np.ndarray,
+    max_distance: int,
+) -> Iterable[np.ndarray]:
+    """
+    Group hash indices whose hashes are transitively within `max_distance`
+    bits of each other.  Yields arrays of indices for groups of 2 or more,
+    largest groups first.
+    """
+    # Exact duplicates are grouped for free; only compare distinct hashes.
+    unique_hashes, inverse = np.unique(hashes, return_inverse=True)
+    inverse = inverse.ravel()
+    if max_distance > 0:
+        edges_a, edges_b = find_near_duplicate_edges(unique_hashes, max_distance)
+        unique_labels = _connected_components(len(unique_hashes), edges_a, edges_b)
+    else:
+        unique_labels = np.arange(len(unique_hashes))
+    labels = unique_labels[inverse]
+    order = np.argsort(labels, kind="stable")
+    run_starts = np.flatnonzero(np.diff(labels[order])) + 1
+    groups = [g for g in np.split(order, run_starts) if len(g) > 1]
+    groups.sort(key=len, reverse=True)
+    yield from groups
@@ -3,8 +3,8 @@ import logging
 from collections.abc import Iterable
 
 from pe_tools import Struct3, u8, u16, u32
-from pe_tools.rsrc import KnownResourceTypes
 
+from res_extract.resource_types import KnownResourceTypes
 from res_extract.resources import ResourceEntry
 
 log = logging.getLogger(__name__)
@@ -65,7 +65,8 @@ def reassemble_ico(dents_and_datas, idType: int, height_divisor: int = 1) -> byt
         vs = vars(gdent).copy()
         vs.pop("nId")
         vs["dwImageOffset"] = offset
-        vs["bHeight"] //= height_divisor  # For cursors; the actual data may have a trailing 1-bit mask
+        # For cursors; the actual data may have a trailing 1-bit mask
+        vs["bHeight"] //= height_divisor
         offsets.append(offset)
         offset += vs["dwBytesInRes"]
         fdent = ICONDIRENTRY(**vs)
@@ -0,0 +1,145 @@
+"""
+Decode image-like resources (bitmaps, icons, cursors) without touching the filesystem.
+"""
+from __future__ import annotations
+
+import io
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from PIL import Image
+
+from res_extract import icons as libicons
+from res_extract.resource_types import KnownResourceTypes
+from res_extract.resources import ResourceEntry
+
+IMAGE_KINDS = ("bmp", "ico", "cur")
+OUTPUT_FORMATS = ("png", "pil")
+
+
+@dataclass
+class ImageSource:
+    """
+    An encoded image ready for decoding: a DIB for bitmaps, or a
+    reassembled ICO/CUR file for icon and cursor groups.
+    """
+
+    kind: str
+    resource: ResourceEntry
+    data: bytes
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}_{self.resource.filename_part}"
+
+
+@dataclass
+class ExtractedImage:
+    kind: str
+    name: str
+    resource: ResourceEntry
+    size: tuple[int, int]
+    png: bytes | None = None
+    image: Any = None  # PIL.Image.Image, when requested
+
+    def __repr__(self):
+        return f"<ExtractedImage {self.name} {self.size[0]}x{self.size[1]}>"
+
+
+def validate_kinds(kinds: Iterable[str]) -> frozenset[str]:
+    kinds = frozenset(kinds)
+    unknown_kinds = kinds - set(IMAGE_KINDS)
+    if unknown_kinds:
+        raise ValueError(f"Unknown image kinds: {sorted(unknown_kinds)}")
+    return kinds
+
+
+def iter_ico_frames(img: Image.Image):
+    """
+    Iterate over the frames of an opened ICO/CUR image.
+
+    Yields (suffix, image) tuples; the same image object is reused (and
+    reloaded) for each frame, so copy it if you need to keep it around.
+    """
+    for size in img.info.get("sizes") or (None,):  # CURs don't have a "sizes" key
+        if size:
+            w, h = size
+            img.size = size
+            suffix = f"_{w}x{h}"
+        else:
+            suffix = ""
+        img.load()
+        yield suffix, img
+
+
+def iter_image_sources(
+    resources: list[ResourceEntry],
+    *,
+    kinds: Iterable[str] = IMAGE_KINDS,
+) -> Iterable[ImageSource]:
+    kinds = validate_kinds(kinds)
+    resources = [r for r in resources if r.has_windows_types]
+    if "bmp" in kinds:
+        for r in resources:
+            if r.type_id == KnownResourceTypes.RT_BITMAP:
+                yield ImageSource(kind="bmp", resource=r, data=r.data)
+    if "ico" in kinds:
+        for r, ico_data in libicons.extract_icons(resources):
+            yield ImageSource(kind="ico", resource=r, data=ico_data)
+    if "cur" in kinds:
+        for r, cur_data in libicons.extract_cursors(resources):
+            yield ImageSource(kind="cur", resource=r, data=cur_data)
+
+
+def _make_extracted_image(
+    source: ImageSource,
+    img: Image.Image,
+    name: str,
+    output: str,
+) -> ExtractedImage:
+    extracted = ExtractedImage(
+        kind=source.kind,
+        name=name,
+        resource=source.resource,
+        size=img.size,
+    )
+    if output == "pil":
+        extracted.image = img.copy()
+    else:
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        extracted.png = buf.getvalue()
+    return extracted
+
+
+def decode_image_source(
+    source: ImageSource,
+    *,
+    output: str = "png",
+) -> list[ExtractedImage]:
+    """
+    Decode an image source into one image (bitmaps) or one image per
+    frame size (icons, cursors), either as PNG bytes or PIL images.
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output!r}")
+    # Here's hoping DibImageFile can handle bitmaps!
+    img = Image.open(io.BytesIO(source.data))
+    if source.kind == "bmp":
+        img.load()
+        return [_make_extracted_image(source, img, source.name, output)]
+    return [
+        _make_extracted_image(source, frame, f"{source.name}{suffix}", output)
+        for suffix, frame in iter_ico_frames(img)
+    ]
+
+
+def iter_images(
+    resources: list[ResourceEntry],
+    *,
+    kinds: Iterable[str] = IMAGE_KINDS,
+    output: str = "png",
+) -> Iterable[ExtractedImage]:
+    for source in iter_image_sources(resources, kinds=kinds):
+        yield from decode_image_source(source, output=output)
@@ -0,0 +1,367 @@
+"""
+Read resource entries from LE/LX binaries (Windows VxDs, OS/2 executables).
+"""
+from __future__ import annotations
+
+import logging
+import struct
+from dataclasses import dataclass
+
+from res_extract.errors import BadResourceTable, NotLEFile
+from res_extract.resources import ResourceEntry
+
+log = logging.getLogger(__name__)
+
+# H/T http://www.edm2.com/index.php/LX_-_Linear_eXecutable_Module_Format_Description
+# H/T https://github.com/wine-mirror/wine/blob/master/include/winnt.h (IMAGE_VXD_HEADER)
+
+LE_HEADER_SIZE = 0xC4  # Including the VxD-specific tail
+LE_PAGE_MAP_ENTRY_SIZE = 4
+LX_PAGE_MAP_ENTRY_SIZE = 8
+LX_RESOURCE_ENTRY_SIZE = 14
+OBJECT_ENTRY_SIZE = 24
+
+# LX object page table entry flags
+LX_PAGE_VALID = 0
+LX_PAGE_ITERATED = 1
+LX_PAGE_INVALID = 2
+LX_PAGE_ZEROED = 3
+LX_PAGE_RANGE = 4
+LX_PAGE_COMPRESSED = 5
+
+
+@dataclass
+class LEHeader:
+    magic: bytes
+    cpu_type: int
+    os_type: int
+    page_count: int
+    page_size: int
+    page_shift: int  # Bytes on last page for LE
+    object_table_offset: int
+    object_count: int
+    object_page_table_offset: int
+    resource_table_offset: int
+    resource_count: int
+    data_pages_offset: int
+    winres_offset: int
+    winres_length: int
+
+    @classmethod
+    def from_buffer(cls, buf: bytes):
+        buf = buf.ljust(LE_HEADER_SIZE, b"\0")  # Non-VxDs may not have the tail
+        return cls(
+            magic=buf[0:2],
+            cpu_type=struct.unpack_from("<H", buf, 0x08)[0],
+            os_type=struct.unpack_from("<H", buf, 0x0A)[0],
+            page_count=struct.unpack_from("<I", buf, 0x14)[0],
+            page_size=struct.unpack_from("<I", buf, 0x28)[0],
+            page_shift=struct.unpack_from("<I", buf, 0x2C)[0],
+            object_table_offset=struct.unpack_from("<I", buf, 0x40)[0],
+            object_count=struct.unpack_from("<I", buf, 0x44)[0],
+            object_page_table_offset=struct.unpack_from("<I", buf, 0x48)[0],
+            resource_table_offset=struct.unpack_from("<I", buf, 0x50)[0],
+            resource_count=struct.unpack_from("<I", buf, 0x54)[0],
+            data_pages_offset=struct.unpack_from("<I", buf, 0x80)[0],
+            winres_offset=struct.unpack_from("<I", buf, 0xB8)[0],
+            winres_length=struct.unpack_from("<I", buf, 0xBC)[0],
+        )
+
+    @property
+    def is_lx(self) -> bool:
+        return self.magic == b"LX"
+
+
+@dataclass
+class LEObject:
+    virtual_size: int
+    page_table_index: int  # 1-based
+    page_count: int
+
+
+@dataclass
+class LXResourceEntry:
+    type_id: int
+    res_id: int
+    size: int
+    object_number: int  # 1-based
+    offset: int
+
+
+def find_le_header_offset(exe) -> int:
+    """
+    Find the offset of the LE/LX header, or raise NotLEFile.
+    """
+    name = str(getattr(exe, "name", exe))
+    exe.seek(0)
+    mz_header = exe.read(0x40)
+    signature = mz_header[:2]
+    if signature in (b"LE", b"LX"):  # No DOS stub
+        return 0
+    if signature != b"MZ" or len(mz_header) < 0x40:
+        raise NotLEFile(
+            f"{name} doesn't look like a LE/LX file (initial MZ signature is {signature!r})",
+        )
+    (le_header_offset,) = struct.unpack_from("<I", mz_header, 0x3C)
+    exe.seek(le_header_offset)
+    magic = exe.read(2)
+    if magic not in (b"LE", b"LX"):
+        raise NotLEFile(
+            f"{name} doesn't look like a LE/LX file (magic {magic!r} at offset {hex(le_header_offset)} not 'LE'/'LX')",
+        )
+    return le_header_offset
+
+
+def _read_exactly(exe, offset: int, length: int) -> bytes:
+    exe.seek(offset)
+    data = exe.read(length)
+    if len(data) != length:
+        raise BadResourceTable(
+            f"wanted {length} bytes at {hex(offset)}, got {len(data)}",
+        )
+    return data
+
+
+def read_le_objects(buf: bytes, count: int) -> list[LEObject]:
+    objects = []
+    for i in range(count):
+        (
+            virtual_size,
+            _reloc_base,
+            _flags,
+            page_table_index,
+            page_count,
+            _,
+        ) = struct.unpack_from("<6I", buf, i * OBJECT_ENTRY_SIZE)
+        objects.append(
+            LEObject(
+                virtual_size=virtual_size,
+                page_table_index=page_table_index,
+                page_count=page_count,
+            ),
+        )
+    return objects
+
+
+def read_lx_resource_table(buf: bytes, count: int) -> list[LXResourceEntry]:
+    entries = []
+    for i in range(count):
+        type_id, res_id, size, object_number, offset = struct.unpack_from(
+            "<HHIHI",
+            buf,
+            i * LX_RESOURCE_ENTRY_SIZE,
+        )
+        entries.append(
+            LXResourceEntry(
+                type_id=type_id,
+                res_id=res_id,
+                size=size,
+                object_number=object_number,
+                offset=offset,
+            ),
+        )
+    return entries
+
+
+class _PageReader:
+    """
+    Reads logical (object-relative) data out of the physical pages of a LE/LX file.
+
+    The most recently read page is kept around, since small resources
+    tend to share pages.
+    """
+
+    def __init__(self, exe, header: LEHeader, page_map: bytes):
+        self.exe = exe
+        self.header = header
+        self.page_map = page_map
+        self._cached_page = (None, b"")
+
+    def _locate_page(self, page_index: int) -> tuple[int, int, int]:
+        # Returns (file offset, physical size, flags) of a 0-based page
+        header = self.header
+        if header.is_lx:
+            offset, size, flags = struct.unpack_from(
+                "<IHH",
+                self.page_map,
+                page_index * LX_PAGE_MAP_ENTRY_SIZE,
+            )
+            return (
+                header.data_pages_offset + (offset << header.page_shift),
+                size,
+                flags,
+            )
+        entry = self.page_map[
+            page_index
+            * LE_PAGE_MAP_ENTRY_SIZE : (page_index + 1)
+            * LE_PAGE_MAP_ENTRY_SIZE
+        ]
+        page_number = (entry[0] << 16) | (entry[1] << 8) | entry[2]  # 1-based
+        flags = entry[3]  # Same values as the LX page flags
+        if flags != LX_PAGE_VALID:
+            return (0, 0, flags)
+        if page_number == 0:
+            raise BadResourceTable(f"page {page_index} has bogus page number 0")
+        size = header.page_size
+        if page_number == header.page_count:
+            size = header.page_shift or size  # Bytes on last page
+        return (
+            header.data_pages_offset + (page_number - 1) * header.page_size,
+            size,
+            flags,
+        )
+
+    def read_page(self, page_index: int) -> bytes:
+        if self._cached_page[0] == page_index:
+            return self._cached_page[1]
+        if not (0 <= page_index < self.header.page_count):
+            raise BadResourceTable(f"page {page_index} out of range")
+        offset, size, flags = self._locate_page(page_index)
+        if flags == LX_PAGE_VALID:
+            self.exe.seek(offset)
+            data = self.exe.read(size)
+        elif flags in (LX_PAGE_ZEROED, LX_PAGE_INVALID):
+            data = b""
+        else:
+            raise BadResourceTable(
+                f"page {page_index} uses unsupported page type {flags}",
+            )
+        data = data.ljust(self.header.page_size, b"\0")
+        self._cached_page = (page_index, data)
+        return data
+
+    def read(self, obj: LEObject, offset: int, length: int) -> bytes:
+        page_size = self.header.page_size
+        if offset + length > obj.page_count * page_size:
+            raise BadResourceTable(
+                f"{length} bytes at {hex(offset)} overrun object pages",
+            )
+        chunks = []
+        while length > 0:
+            page_index = obj.page_table_index - 1 + offset // page_size
+            in_page = offset % page_size
+            chunk_length = min(page_size - in_page, length)
+            chunks.append(self.read_page(page_index)[in_page : in_page + chunk_length])
+            offset += chunk_length
+            length -= chunk_length
+        return b"".join(chunks)
+
+
+def _read_winres_name(buf: bytes, pos: int) -> tuple[int, str | None, int]:
+    # .RES-style name or ordinal: 0xFF followed by an u16, or a NUL-terminated string
+    if pos >= len(buf):
+        raise BadResourceTable("truncated resource name in VxD resources")
+    if buf[pos] == 0xFF:
+        if pos + 3 > len(buf):
+            raise BadResourceTable("truncated resource ordinal in VxD resources")
+        return struct.unpack_from("<H", buf, pos + 1)[0], None, pos + 3
+    end = buf.find(b"\0", pos)
+    if end == -1:
+        raise BadResourceTable("unterminated resource name in VxD resources")
+    return 0, buf[pos:end].decode("ascii", errors="replace"), end + 1
+
+
+def read_vxd_resources(buf: bytes):
+    """
+    Read the 16-bit, .RES-format Windows resources (usually just a
+    VERSIONINFO) that Windows VxDs carry outside the LE resource table.
+    """
+    pos = 0
+    while pos < len(buf) and buf[pos] != 0:
+        type_id, type_name, pos = _read_winres_name(buf, pos)
+        res_id, res_name, pos = _read_winres_name(buf, pos)
+        if pos + 6 > len(buf):
+            raise BadResourceTable("truncated VxD resource header")
+        _flags, size = struct.unpack_from("<HI", buf, pos)
+        pos += 6
+        data = buf[pos : pos + size]
+        if len(data) != size:
+            raise BadResourceTable("truncated VxD resource")
+        pos += size
+        if type_name is not None:
+            log.debug("skipping VxD resource with string type %s", type_name)
+            continue
+        yield ResourceEntry(
+            data=data,
+            lang_id=0,
+            name=res_name,
+            res_id=res_id,
+            type_id=type_id,
+            exe_format="LE",
+        )
+
+
+def read_le_resources(exe):
+    """
+    Read resources from a LE/LX file.
+
+    Entries from the LE/LX resource table (used by OS/2) are yielded with
+    `exe_format="LX"`, as their type IDs are OS/2's, not Windows'.
+    Windows VxDs' out-of-table 16-bit resources are yielded with
+    `exe_format="LE"`.
+    """
+    name = str(getattr(exe, "name", exe))
+    le_header_offset = find_le_header_offset(exe)
+    header_buf = _read_exactly(exe, le_header_offset, 0x58)
+    header_buf += exe.read(LE_HEADER_SIZE - len(header_buf))
+    header = LEHeader.from_buffer(header_buf)
+
+    if header.resource_count:
+        if not header.page_size:
+            raise BadResourceTable(f"{name}: page size is zero")
+        objects = read_le_objects(
+            _read_exactly(
+                exe,
+                le_header_offset + header.object_table_offset,
+                header.object_count * OBJECT_ENTRY_SIZE,
+            ),
+            header.object_count,
+        )
+        page_map = _read_exactly(
+            exe,
+            le_header_offset + header.object_page_table_offset,
+            header.page_count
+            * (LX_PAGE_MAP_ENTRY_SIZE if header.is_lx else LE_PAGE_MAP_ENTRY_SIZE),
+        )
+        resource_entries = read_lx_resource_table(
+            _read_exactly(
+                exe,
+                le_header_offset + header.resource_table_offset,
+                header.resource_count * LX_RESOURCE_ENTRY_SIZE,
+            ),
+            header.resource_count,
+        )
+        page_reader = _PageReader(exe, header, page_map)
+        # Read in physical order to keep seeking to a minimum
+        resource_entries.sort(key=lambda re: (re.object_number, re.offset))
+        for re in resource_entries:
+            if not (1 <= re.object_number <= len(objects)):
+                log.warning(
+                    "%s: resource %d/%d refers to bogus object %d",
+                    name,
+                    re.type_id,
+                    re.res_id,
+                    re.object_number,
+                )
+                continue
+            try:
+                data = page_reader.read(
+                    objects[re.object_number - 1],
+                    re.offset,
+                    re.size,
+                )
+            except BadResourceTable as exc:
+                log.warning("%s: resource %d/%d: %s", name, re.type_id, re.res_id, exc)
+                continue
+            yield ResourceEntry(
+                data=data,
+                lang_id=0,
+                res_id=re.res_id,
+                type_id=re.type_id,
+                exe_format="LX",
+            )
+
+    if not header.is_lx and header.winres_offset and header.winres_length:
+        yield from read_vxd_resources(
+            _read_exactly(exe, header.winres_offset, header.winres_length),
+        )
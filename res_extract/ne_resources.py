@@ -7,9 +7,8 @@ import logging
 import struct
 from dataclasses import dataclass
 
-from pe_tools import KnownResourceTypes
-
 from res_extract.errors import BadResourceTable, NotNEFile
+from res_extract.resource_types import KnownResourceTypes
 from res_extract.resources import ResourceEntry
 
 log = logging.getLogger(__name__)
@@ -218,6 +217,7 @@ def read_ne_resources(exe):
             name=re.res_name,
             res_id=re.res_id,
             type_id=re.type_id,
+            exe_format="NE",
         )
 
 
@@ -0,0 +1,64 @@
+"""
+Resource type IDs.
+
+These mirror `pe_tools.KnownResourceTypes`, so parsing non-PE files
+doesn't need to import pe_tools.
+"""
+from __future__ import annotations
+
+
+class KnownResourceTypes:
+    RT_CURSOR = 1
+    RT_BITMAP = 2
+    RT_ICON = 3
+    RT_MENU = 4
+    RT_DIALOG = 5
+    RT_STRING = 6
+    RT_FONTDIR = 7
+    RT_FONT = 8
+    RT_ACCELERATOR = 9
+    RT_RCDATA = 10
+    RT_MESSAGETABLE = 11
+    RT_GROUP_CURSOR = 12
+    RT_GROUP_ICON = 14
+    RT_VERSION = 16
+    RT_DLGINCLUDE = 17
+    RT_PLUGPLAY = 19
+    RT_VXD = 20
+    RT_ANICURSOR = 21
+    RT_ANIICON = 22
+    RT_HTML = 23
+    RT_MANIFEST = 24
+
+    @classmethod
+    def get_type_name(cls, num) -> str:
+        for k in dir(cls):
+            if k.startswith("RT_") and getattr(cls, k, None) == num:
+                return k
+        return str(num)
+
+
+# OS/2 numbers its resource types differently from Windows
+OS2_RESOURCE_TYPES = {
+    1: "RT_POINTER",
+    2: "RT_BITMAP",
+    3: "RT_MENU",
+    4: "RT_DIALOG",
+    5: "RT_STRING",
+    6: "RT_FONTDIR",
+    7: "RT_FONT",
+    8: "RT_ACCELTABLE",
+    9: "RT_RCDATA",
+    10: "RT_MESSAGE",
+    11: "RT_DLGINCLUDE",
+    12: "RT_VKEYTBL",
+    13: "RT_KEYTBL",
+    14: "RT_CHARTBL",
+    15: "RT_DISPLAYINFO",
+    16: "RT_FKASHORT",
+    17: "RT_FKALONG",
+    18: "RT_HELPTABLE",
+    19: "RT_HELPSUBTABLE",
+    20: "RT_FDDIR",
+    21: "RT_FD",
+}
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import struct
 from collections.abc import Iterable
 from dataclasses import dataclass
 
-import grope
-from pe_tools import KnownResourceTypes, parse_pe
+from res_extract.resource_types import OS2_RESOURCE_TYPES, KnownResourceTypes
 
 
 @dataclass
@@ -14,11 +14,18 @@ class ResourceEntry:
     lang_id: int
     data: bytes
     name: str | None = None
+    exe_format: str = "PE"
 
     @property
     def type(self):
+        if self.exe_format == "LX":
+            return OS2_RESOURCE_TYPES.get(self.type_id, str(self.type_id))
         return KnownResourceTypes.get_type_name(self.type_id)
 
+    @property
+    def has_windows_types(self) -> bool:
+        return self.exe_format != "LX"
+
     @property
     def filename_part(self) -> str:
         bits = []
@@ -35,7 +42,46 @@ class ResourceEntry:
         return f"{self.type}({self.res_id} @ {self.lang_id}, {len(self.data)} bytes)"
 
 
+def sniff_exe_format(exe_fp) -> str | None:
+    """
+    Peek at the headers of an executable to figure out its format
+    ("PE", "NE", "LE" or "LX"), so we don't need to try parsing it as
+    each format in turn.  Returns None if there's no telling.
+    """
+    exe_fp.seek(0)
+    mz_header = exe_fp.read(0x40)
+    exe_fp.seek(0)
+    if mz_header[:2] in (b"LE", b"LX"):  # Stubless LE/LX
+        return mz_header[:2].decode()
+    if mz_header[:2] != b"MZ" or len(mz_header) < 0x40:
+        return None
+    (new_header_offset,) = struct.unpack_from("<I", mz_header, 0x3C)
+    exe_fp.seek(new_header_offset)
+    magic = exe_fp.read(4)
+    exe_fp.seek(0)
+    if magic == b"PE\0\0":
+        return "PE"
+    if magic[:2] in (b"NE", b"LE", b"LX"):
+        return magic[:2].decode()
+    return None
+
+
 def get_resources_from_file(exe_fp) -> Iterable[ResourceEntry]:
+    exe_format = sniff_exe_format(exe_fp)
+    if exe_format in ("LE", "LX"):
+        from res_extract.le_resources import read_le_resources
+
+        yield from read_le_resources(exe_fp)
+        return
+    if exe_format == "NE":
+        from res_extract.ne_resources import read_ne_resources
+
+        yield from read_ne_resources(exe_fp)
+        return
+
+    import grope
+    from pe_tools import parse_pe
+
     try:
         pe = parse_pe(grope.wrap_io(exe_fp))
     except RuntimeError as rte:
@@ -0,0 +1,259 @@
+"""
+Pass resource payloads and decoded pixel buffers between processes
+through pooled shared memory, instead of pickling them.
+
+The producing process owns a `SharedPayloadPool`; it copies payloads into
+(large, recycled) shared memory segments and hands out small picklable
+`PayloadHandle`s.  Consumers read them through a `SharedPayloadClient`
+and release them when done; a segment is recycled once every payload in
+it has been released.  Only the handles (segment name, offset, length,
+and for pixel buffers, shape) travel through pickling.
+
+    # Producer
+    pool = SharedPayloadPool()
+    handle = pool.put_bytes(resource.data)
+    # ... send `handle` to a worker that has
+    client = SharedPayloadClient(pool.release_queue, max_segments=pool.max_segments)
+    data = client.read_bytes(handle)
+    client.release(handle)
+"""
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+ALIGNMENT = 64
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+
+
+class PayloadHandle(NamedTuple):
+    segment: str
+    offset: int
+    length: int
+    # For pixel buffers: (width, height) and the PIL mode; otherwise empty
+    shape: tuple[int, ...] = ()
+    mode: str = ""
+
+
+def _align(n: int) -> int:
+    return (n + ALIGNMENT - 1) & ~(ALIGNMENT - 1)
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        # Only the owner should ever unlink the segment
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+@dataclass
+class _Segment:
+    shm: SharedMemory
+    used: int = 0
+    refcount: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+
+class SharedPayloadPool:
+    """
+    Allocates payloads into pooled shared memory segments (owner side).
+
+    Allocation is bump-pointer within a segment; each allocation holds a
+    reference on its segment until released.  When all segments are in use
+    and `max_segments` is reached, allocating blocks until a consumer
+    releases something, which keeps producers from running ahead.  If
+    nothing is released within `release_timeout` seconds (e.g. because a
+    consumer died while holding handles), a TimeoutError is raised.
+    """
+
+    def __init__(
+        self,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_segments: int = 16,
+        release_timeout: float | None = 120.0,
+        ctx=None,
+    ):
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.release_timeout = release_timeout
+        self.release_queue = (ctx or multiprocessing).Queue()
+        # Start the resource tracker now, so worker processes started after
+        # this share it; otherwise each worker would get a tracker of its own,
+        # which would unlink the segments it attached to when the worker exits.
+        resource_tracker.ensure_running()
+        self._segments: dict[str, _Segment] = {}
+        self._current: _Segment | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create_segment(self, size: int) -> _Segment:
+        segment = _Segment(shm=SharedMemory(create=True, size=size))
+        self._segments[segment.shm.name] = segment
+        return segment
+
+    def _destroy_segment(self, segment: _Segment):
+        del self._segments[segment.shm.name]
+        if self._current is segment:
+            self._current = None
+        segment.shm.close()
+        segment.shm.unlink()
+
+    def _release(self, segment_name: str):
+        segment = self._segments[segment_name]
+        segment.refcount -= 1
+        if segment.refcount == 0:
+            segment.used = 0  # Nothing live in it; recycle
+
+    def _drain_releases(self):
+        try:
+            while True:
+                self._release(self.release_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _find_segment(self, length: int) -> _Segment | None:
+        current = self._current
+        if current and current.used + length <= current.size:
+            return current
+        for segment in self._segments.values():
+            if segment.refcount == 0 and segment.size >= length:
+                return segment
+        if len(self._segments) >= self.max_segments:
+            # Make room for an outsized payload by dropping a free segment
+            free = [s for s in self._segments.values() if s.refcount == 0]
+            if not free:
+                return None
+            self._destroy_segment(free[0])
+        return self._create_segment(max(self.segment_size, _align(length)))
+
+    def allocate(self, length: int) -> tuple[PayloadHandle, memoryview]:
+        """
+        Reserve `length` bytes; returns the handle and a writable view.
+        """
+        self._drain_releases()
+        while (segment := self._find_segment(length)) is None:
+            try:
+                self._release(
+                    self.release_queue.get(timeout=self.release_timeout),
+                )
+            except queue.Empty:
+                raise TimeoutError(
+                    f"all {len(self._segments)} shared memory segments are in use "
+                    f"and nothing was released in {self.release_timeout} seconds; "
+                    f"did a consumer die?",
+                ) from None
+            self._drain_releases()
+        self._current = segment
+        offset = segment.used
+        segment.used = _align(offset + length)
+        segment.refcount += 1
+        handle = PayloadHandle(segment=segment.shm.name, offset=offset, length=length)
+        return handle, segment.shm.buf[offset : offset + length]
+
+    def put_bytes(self, data) -> PayloadHandle:
+        """
+        Copy a bytes-like payload into shared memory.
+        """
+        handle, view = self.allocate(len(data))
+        view[:] = data
+        view.release()
+        return handle
+
+    def put_image(self, img) -> PayloadHandle:
+        """
+        Copy a decoded PIL image's pixels into shared memory.
+        """
+        handle = self.put_bytes(img.tobytes())
+        return handle._replace(shape=img.size, mode=img.mode)
+
+    def release(self, handle: PayloadHandle):
+        """
+        Release a handle from the owning process.
+        """
+        self._release(handle.segment)
+
+    def close(self):
+        self._drain_releases()
+        for segment in list(self._segments.values()):
+            self._destroy_segment(segment)
+
+
+class SharedPayloadClient:
+    """
+    Reads payloads by handle (consumer side), attaching to each segment once.
+
+    The owner never keeps more than `max_segments` segments alive, so once
+    more than that are attached here, the least recently used ones that
+    hold no unreleased handles are detached; they have most likely been
+    destroyed by the owner, and would otherwise stay mapped for as long
+    as this client lives.
+    """
+
+    def __init__(self, release_queue, *, max_segments: int = 16):
+        self.release_queue = release_queue
+        self.max_segments = max_segments
+        self._segments: OrderedDict[str, SharedMemory] = OrderedDict()
+        self._checked_out: dict[str, set[PayloadHandle]] = {}
+
+    def _detach_idle(self):
+        for name in list(self._segments):
+            if len(self._segments) < self.max_segments:
+                break
+            if not self._checked_out.get(name):
+                self._checked_out.pop(name, None)
+                self._segments.pop(name).close()
+
+    def view(self, handle: PayloadHandle) -> memoryview:
+        """
+        Get a zero-copy view of a payload.  Release the view before
+        releasing the handle.
+        """
+        shm = self._segments.get(handle.segment)
+        if shm is None:
+            self._detach_idle()
+            shm = self._segments[handle.segment] = _attach(handle.segment)
+        else:
+            self._segments.move_to_end(handle.segment)
+        self._checked_out.setdefault(handle.segment, set()).add(handle)
+        return shm.buf[handle.offset : handle.offset + handle.length]
+
+    @property
+    def attached_segments(self) -> int:
+        return len(self._segments)
+
+    def read_bytes(self, handle: PayloadHandle) -> bytes:
+        with self.view(handle) as view:
+            return bytes(view)
+
+    def read_image(self, handle: PayloadHandle):
+        """
+        Reconstruct a PIL image put with `put_image` (copying the pixels).
+        """
+        from PIL import Image
+
+        with self.view(handle) as view:
+            return Image.frombytes(handle.mode, handle.shape, bytes(view))
+
+    def release(self, handle: PayloadHandle):
+        self._checked_out.get(handle.segment, set()).discard(handle)
+        self.release_queue.put(handle.segment)
+
+    def close(self):
+        for shm in self._segments.values():
+            shm.close()
+        self._segments.clear()
+        self._checked_out.clear()
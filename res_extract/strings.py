@@ -0,0 +1,69 @@
+"""
+Decode RT_STRING string table resources.
+"""
+from __future__ import annotations
+
+import struct
+
+from res_extract.errors import BadStringTable
+from res_extract.resources import ResourceEntry
+
+# Each RT_STRING resource holds a block of 16 strings; string ID N lives in
+# the block with resource ID (N // 16) + 1, at index N % 16.
+# H/T https://devblogs.microsoft.com/oldnewthing/20040130-00/?p=40813
+STRINGS_PER_BLOCK = 16
+
+
+def _read_pe_string(data: bytes, offset: int) -> tuple[str, int]:
+    # Length-prefixed (u16, in characters), UTF-16LE, not NUL-terminated
+    if offset + 2 > len(data):
+        raise BadStringTable(f"string table truncated at offset {offset}")
+    (length,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    end = offset + length * 2
+    if end > len(data):
+        raise BadStringTable(f"string at offset {offset} overruns the table")
+    return data[offset:end].decode("utf-16le", errors="replace"), end
+
+
+def _read_ne_string(data: bytes, offset: int, encoding: str) -> tuple[str, int]:
+    # Length-prefixed (u8, in bytes), ANSI, not NUL-terminated
+    if offset + 1 > len(data):
+        raise BadStringTable(f"string table truncated at offset {offset}")
+    length = data[offset]
+    offset += 1
+    end = offset + length
+    if end > len(data):
+        raise BadStringTable(f"string at offset {offset} overruns the table")
+    return data[offset:end].decode(encoding, errors="replace"), end
+
+
+def decode_string_table(
+    resource: ResourceEntry,
+    *,
+    ne_encoding: str = "cp1252",
+) -> dict[int, str]:
+    """
+    Decode a RT_STRING block into a mapping of string ID to string.
+
+    Empty slots in the block are omitted.  16-bit (NE) tables have no
+    notion of a code page, so `ne_encoding` is used to decode them.
+    """
+    data = resource.data
+    if isinstance(resource.res_id, int):
+        base_id = (resource.res_id - 1) * STRINGS_PER_BLOCK
+    else:  # Named string tables don't happen in practice, but just in case
+        base_id = 0
+    strings = {}
+    offset = 0
+    for i in range(STRINGS_PER_BLOCK):
+        if offset >= len(data):
+            # Some linkers don't bother to write trailing empty slots
+            break
+        if resource.exe_format == "PE":
+            string, offset = _read_pe_string(data, offset)
+        else:
+            string, offset = _read_ne_string(data, offset, ne_encoding)
+        if string:
+            strings[base_id + i] = string
+    return strings
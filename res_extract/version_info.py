@@ -0,0 +1,176 @@
+"""
+Decode RT_VERSION (VS_VERSIONINFO) resources.
+"""
+import struct
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pe_tools import Struct3, u32
+
+from res_extract.errors import BadVersionInfo
+from res_extract.resources import ResourceEntry
+
+# H/T https://learn.microsoft.com/en-us/windows/win32/menurc/vs-versioninfo
+# H/T https://devblogs.microsoft.com/oldnewthing/20061220-15/?p=28653
+
+FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+# VS_VERSIONINFO > StringFileInfo > StringTable > String
+MAX_NODE_DEPTH = 4
+
+
+class VS_FIXEDFILEINFO(Struct3):
+    dwSignature: u32
+    dwStrucVersion: u32
+    dwFileVersionMS: u32
+    dwFileVersionLS: u32
+    dwProductVersionMS: u32
+    dwProductVersionLS: u32
+    dwFileFlagsMask: u32
+    dwFileFlags: u32
+    dwFileOS: u32
+    dwFileType: u32
+    dwFileSubtype: u32
+    dwFileDateMS: u32
+    dwFileDateLS: u32
+
+
+@dataclass
+class VersionNode:
+    key: str
+    value: bytes
+    children: list["VersionNode"] = field(default_factory=list)
+
+
+def _align4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _read_key(data: bytes, offset: int, end: int, wide: bool) -> tuple[str, int]:
+    if wide:
+        pos = offset
+        while pos + 1 < end and data[pos : pos + 2] != b"\0\0":
+            pos += 2
+        return data[offset:pos].decode("utf-16le", errors="replace"), pos + 2
+    pos = data.find(b"\0", offset, end)
+    if pos == -1:
+        pos = end
+    return data[offset:pos].decode("ascii", errors="replace"), pos + 1
+
+
+def _parse_node(
+    data: bytes,
+    offset: int,
+    *,
+    wide: bool,
+    parent_key: Optional[str] = None,
+    text_value: bool = False,
+    depth: int = 1,
+) -> tuple[VersionNode, int]:
+    """
+    Parse a single node (and its children) at `offset`.
+
+    Returns the node and the offset of the next sibling.
+    """
+    if depth > MAX_NODE_DEPTH:
+        raise BadVersionInfo(f"version info nested too deeply at offset {offset}")
+    header_size = 6 if wide else 4
+    if offset + header_size > len(data):
+        raise BadVersionInfo(f"version info node truncated at offset {offset}")
+    length, value_length = struct.unpack_from("<HH", data, offset)
+    if length < header_size:
+        raise BadVersionInfo(f"version info node at {offset} has bogus length {length}")
+    end = min(offset + length, len(data))
+    key, pos = _read_key(data, offset + header_size, end, wide)
+    pos = _align4(pos)
+    if text_value and wide:
+        # Specified in characters, though some compilers write bytes
+        value_length *= 2
+    value = data[pos : min(pos + value_length, end)]
+    pos = _align4(pos + value_length)
+    children = []
+    while pos < end:
+        # Only the StringFileInfo/<lang-codepage>/<key> leaves contain text
+        child, pos = _parse_node(
+            data,
+            pos,
+            wide=wide,
+            parent_key=key,
+            text_value=(parent_key == "StringFileInfo"),
+            depth=depth + 1,
+        )
+        children.append(child)
+    return VersionNode(key=key, value=value, children=children), _align4(end)
+
+
+def _decode_text(value: bytes, wide: bool, encoding: str) -> str:
+    text = value.decode("utf-16le" if wide else encoding, errors="replace")
+    return text.split("\0", 1)[0]
+
+
+def _version_string(ms: int, ls: int) -> str:
+    return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+
+
+def _decode_fixed_info(value: bytes) -> Optional[dict]:
+    if len(value) < VS_FIXEDFILEINFO.calcsize():
+        return None
+    fi = VS_FIXEDFILEINFO.unpack_from(value)
+    if fi.dwSignature != FIXEDFILEINFO_SIGNATURE:
+        raise BadVersionInfo(
+            f"VS_FIXEDFILEINFO signature {fi.dwSignature:#x} is not {FIXEDFILEINFO_SIGNATURE:#x}",
+        )
+    return {
+        "file_version": _version_string(fi.dwFileVersionMS, fi.dwFileVersionLS),
+        "product_version": _version_string(
+            fi.dwProductVersionMS,
+            fi.dwProductVersionLS,
+        ),
+        "file_flags_mask": fi.dwFileFlagsMask,
+        "file_flags": fi.dwFileFlags,
+        "file_os": fi.dwFileOS,
+        "file_type": fi.dwFileType,
+        "file_subtype": fi.dwFileSubtype,
+        "file_date": (fi.dwFileDateMS << 32) | fi.dwFileDateLS,
+    }
+
+
+def parse_version_info(
+    resource: ResourceEntry,
+    *,
+    ne_encoding: str = "cp1252",
+) -> dict:
+    """
+    Decode a VS_VERSIONINFO resource into a JSON-friendly dict.
+
+    The result has the keys `fixed` (decoded VS_FIXEDFILEINFO, or None),
+    `strings` (StringFileInfo tables keyed by their lang/codepage hex key)
+    and `translations` (VarFileInfo\\Translation as (lang, codepage) pairs).
+    """
+    wide = resource.exe_format == "PE"
+    root, _ = _parse_node(resource.data, 0, wide=wide)
+    if root.key != "VS_VERSION_INFO":
+        raise BadVersionInfo(f"unexpected version info root key {root.key!r}")
+    strings: dict[str, dict[str, str]] = {}
+    translations = []
+    for child in root.children:
+        if child.key == "StringFileInfo":
+            for table in child.children:
+                strings[table.key] = {
+                    string.key: _decode_text(string.value, wide, ne_encoding)
+                    for string in table.children
+                }
+        elif child.key == "VarFileInfo":
+            for var in child.children:
+                if var.key == "Translation":
+                    translations.extend(
+                        list(pair)
+                        for pair in struct.iter_unpack(
+                            "<HH",
+                            var.value[: len(var.value) & ~3],
+                        )
+                    )
+    return {
+        "fixed": _decode_fixed_info(root.value),
+        "strings": strings,
+        "translations": translations,
+    }
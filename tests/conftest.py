@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from res_extract.resource_types import KnownResourceTypes
+
+NE_ALIGN_SHIFT = 4
+
+
+def make_ne_file(resources: list[tuple[int, int, bytes]]) -> bytes:
+    """
+    Build a minimal NE file holding the given (type_id, res_id, data) resources.
+    """
+    mz_header = bytearray(0x40)
+    mz_header[0:2] = b"MZ"
+    struct.pack_into("<H", mz_header, 0x18, 0x40)
+    struct.pack_into("<I", mz_header, 0x3C, 0x40)
+    ne_header = bytearray(0x40)
+    ne_header[0:2] = b"NE"
+    struct.pack_into("<H", ne_header, 0x24, len(ne_header))  # Resource table
+
+    by_type: dict[int, list[tuple[int, bytes]]] = {}
+    for type_id, res_id, data in resources:
+        by_type.setdefault(type_id, []).append((res_id, data))
+    table_size = 2 + sum(8 + 12 * len(entries) for entries in by_type.values()) + 3
+    align = 1 << NE_ALIGN_SHIFT
+    data_offset = -(-(len(mz_header) + len(ne_header) + table_size) // align) * align
+
+    table = struct.pack("<H", NE_ALIGN_SHIFT)
+    datas = b""
+    for type_id, entries in by_type.items():
+        table += struct.pack("<HHI", type_id | 0x8000, len(entries), 0)
+        for res_id, data in entries:
+            data = data.ljust(-(-len(data) // align) * align, b"\0")
+            table += struct.pack(
+                "<6H",
+                (data_offset + len(datas)) >> NE_ALIGN_SHIFT,
+                len(data) >> NE_ALIGN_SHIFT,
+                0,
+                res_id | 0x8000,
+                0,
+                0,
+            )
+            datas += data
+    table += b"\0\0\0"  # End of types, empty name table
+    headers = bytes(mz_header + ne_header) + table
+    return headers.ljust(data_offset, b"\0") + datas
+
+
+def make_dib(size: tuple[int, int], color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="BMP")
+    return buf.getvalue()[14:]  # Drop the BITMAPFILEHEADER
+
+
+def make_icon_resources(
+    group_id: int,
+    first_icon_id: int,
+    sizes: list[int],
+    color,
+) -> list[tuple[int, int, bytes]]:
+    """
+    Make a RT_GROUP_ICON and its RT_ICONs (PNG-compressed) of the given sizes.
+    """
+    resources = []
+    group = struct.pack("<HHH", 0, 1, len(sizes))
+    for i, size in enumerate(sizes):
+        buf = io.BytesIO()
+        Image.new("RGBA", (size, size), color).save(buf, format="PNG")
+        data = buf.getvalue()
+        group += struct.pack(
+            "<BBBBHHIH",
+            size,
+            size,
+            0,
+            0,
+            1,
+            32,
+            len(data),
+            first_icon_id + i,
+        )
+        resources.append((KnownResourceTypes.RT_ICON, first_icon_id + i, data))
+    resources.append((KnownResourceTypes.RT_GROUP_ICON, group_id, group))
+    return resources
+
+
+@pytest.fixture
+def ne_exe_data() -> bytes:
+    """
+    A NE file with two bitmaps and two icon groups (of 2 and 1 frames).
+    """
+    return make_ne_file(
+        [
+            (KnownResourceTypes.RT_BITMAP, 1, make_dib((8, 4), "red")),
+            (KnownResourceTypes.RT_BITMAP, 2, make_dib((5, 7), "blue")),
+            *make_icon_resources(10, 100, [16, 32], "green"),
+            *make_icon_resources(11, 200, [24], "yellow"),
+        ],
+    )
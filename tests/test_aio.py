@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from res_extract import aio
+
+EXPECTED_NAMES = [
+    "bmp_1",
+    "bmp_2",
+    "ico_10_32x32",
+    "ico_10_16x16",
+    "ico_11_24x24",
+]
+
+
+def collect(source, **kwargs) -> list:
+    async def _collect():
+        return [image async for image in aio.extract(source, **kwargs)]
+
+    return asyncio.run(_collect())
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 8])
+def test_extract_order(ne_exe_data, concurrency):
+    images = collect(ne_exe_data, concurrency=concurrency)
+    assert [image.name for image in images] == EXPECTED_NAMES
+    assert all(image.png.startswith(b"\x89PNG") for image in images)
+
+
+def test_extract_from_path(ne_exe_data, tmp_path):
+    path = tmp_path / "test.exe"
+    path.write_bytes(ne_exe_data)
+    assert [image.name for image in collect(path)] == EXPECTED_NAMES
+
+
+def test_extract_kinds(ne_exe_data):
+    images = collect(ne_exe_data, kinds=("bmp",))
+    assert [image.name for image in images] == EXPECTED_NAMES[:2]
+
+
+def test_extract_pil(ne_exe_data):
+    images = collect(ne_exe_data, kinds=("ico",), output="pil")
+    assert [image.image.size for image in images] == [(32, 32), (16, 16), (24, 24)]
+    assert all(image.png is None for image in images)
+
+
+def test_extract_memoryview_in_process_pool(ne_exe_data):
+    with ProcessPoolExecutor(2) as executor:
+        images = collect(memoryview(ne_exe_data), executor=executor)
+    assert [image.name for image in images] == EXPECTED_NAMES
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"kinds": ("ico", "png")},
+        {"output": "jpeg"},
+        {"concurrency": 0},
+    ],
+)
+def test_extract_bad_arguments(ne_exe_data, kwargs):
+    with pytest.raises(ValueError):
+        collect(ne_exe_data, **kwargs)
+
+
+def test_extract_aclose_cancels_pending(ne_exe_data, monkeypatch):
+    decode = aio._decode_image_source
+    decoded = []
+    started = threading.Event()
+    unblock = threading.Event()
+
+    def _decode_image_source(source, output):
+        decoded.append(source.name)
+        if source.name == "bmp_2":
+            started.set()
+            unblock.wait(5)  # Keep the only worker busy
+        return decode(source, output)
+
+    monkeypatch.setattr(aio, "_decode_image_source", _decode_image_source)
+
+    async def first_then_close(executor):
+        images = aio.extract(ne_exe_data, executor=executor, concurrency=3)
+        first = await images.__anext__()
+        started.wait(5)
+        await images.aclose()
+        await asyncio.sleep(0)  # Let the cancellation reach the executor
+        return first
+
+    with ThreadPoolExecutor(1) as executor:
+        first = asyncio.run(first_then_close(executor))
+        unblock.set()
+    assert first.name == "bmp_1"
+    # ico_10 was queued behind the blocked bmp_2 and never ran; ico_11
+    # was never submitted
+    assert decoded == ["bmp_1", "bmp_2"]
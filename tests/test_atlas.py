@@ -0,0 +1,27 @@
+from res_extract.atlas import get_atlas_sizes, pack_shelves
+
+
+def overlaps(a, b) -> bool:
+    return (
+        a.atlas == b.atlas
+        and a.x < b.x + b.width
+        and b.x < a.x + a.width
+        and a.y < b.y + b.height
+        and b.y < a.y + a.height
+    )
+
+
+def test_pack_shelves():
+    sizes = [(16, 16), (32, 32), (48, 48), (16, 16), (24, 8)] * 4
+    rects = pack_shelves(sizes, max_size=64)
+    assert [(r.width, r.height) for r in rects] == sizes
+    for i, a in enumerate(rects):
+        assert not any(overlaps(a, b) for b in rects[i + 1 :])
+    assert all(w <= 64 and h <= 64 for w, h in get_atlas_sizes(rects))
+
+
+def test_oversized_rect_gets_own_atlas():
+    small, wide, tall = pack_shelves([(16, 16), (100, 8), (8, 100)], max_size=48)
+    assert len({small.atlas, wide.atlas, tall.atlas}) == 3
+    assert (wide.x, wide.y) == (tall.x, tall.y) == (0, 0)
+    assert get_atlas_sizes([small]) == [(16, 16)]
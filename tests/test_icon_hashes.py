@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from res_extract.icon_hashes import (  # noqa: E402
+    IconHashIndex,
+    IconHashIndexBuilder,
+    _band_layout,
+    _connected_components,
+    _popcount_u64_by_table,
+    dhash,
+    find_near_duplicate_edges,
+    group_near_duplicates,
+    hamming_distances,
+    pack_hash_bits,
+    phash,
+    popcount,
+)
+
+
+def brute_force_groups(hashes: np.ndarray, max_distance: int) -> set[frozenset]:
+    # Union-find over all pairs
+    parents = list(range(len(hashes)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i in range(len(hashes)):
+        for j in range(i + 1, len(hashes)):
+            if bin(int(hashes[i]) ^ int(hashes[j])).count("1") <= max_distance:
+                parents[find(i)] = find(j)
+    groups: dict[int, set] = {}
+    for i in range(len(hashes)):
+        groups.setdefault(find(i), set()).add(i)
+    return {frozenset(g) for g in groups.values() if len(g) > 1}
+
+
+def make_clustered_hashes(rng, clusters: int, per_cluster: int) -> np.ndarray:
+    centers = rng.integers(0, 2**64, size=clusters, dtype=np.uint64)
+    hashes = []
+    for center in centers:
+        for _ in range(per_cluster):
+            flips = rng.choice(64, size=rng.integers(0, 4), replace=False)
+            mask = sum((1 << int(bit)) for bit in flips)
+            hashes.append(int(center) ^ mask)
+    hashes = np.array(hashes, dtype=np.uint64)
+    rng.shuffle(hashes)
+    return hashes
+
+
+def test_pack_hash_bits_msb_first():
+    bits = np.zeros((2, 8, 8), dtype=bool)
+    bits[0, 0, 0] = True
+    bits[1, 7, 7] = True
+    assert pack_hash_bits(bits).tolist() == [1 << 63, 1]
+
+
+@pytest.mark.parametrize("popcount_func", [popcount, _popcount_u64_by_table])
+def test_popcount(popcount_func):
+    values = np.array([0, 1, 0xFF, 2**64 - 1, 0x8000000000000001], dtype=np.uint64)
+    assert popcount_func(values).tolist() == [0, 1, 8, 64, 2]
+    assert popcount_func(values.reshape(1, 5)).shape == (1, 5)
+
+
+def test_hamming_distances():
+    hashes = np.array([0, 0b1011, 2**64 - 1], dtype=np.uint64)
+    assert hamming_distances(hashes, 0b1).tolist() == [1, 2, 63]
+
+
+def test_dhash():
+    rising = np.tile(np.arange(9, dtype=np.uint8) * 20, (1, 8, 1))
+    assert dhash(rising).tolist() == [2**64 - 1]
+    assert dhash(rising[:, :, ::-1]).tolist() == [0]
+
+
+def test_phash():
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, 200, size=(2, 32, 32), dtype=np.uint8)
+    hashes = phash(pixels)
+    assert hashes.dtype == np.uint64
+    assert hashes[0] != hashes[1]
+    # Brightness only affects the DC term, which is left out
+    assert phash(pixels + 50).tolist() == hashes.tolist()
+
+
+@pytest.mark.parametrize("bands", [1, 3, 5, 64])
+def test_band_layout(bands):
+    layout = _band_layout(bands)
+    assert len(layout) == bands
+    assert layout[0][0] == 0
+    for (shift, width), (next_shift, _) in zip(layout, layout[1:]):
+        assert shift + width == next_shift
+    assert sum(width for _, width in layout) == 64
+
+
+def test_connected_components():
+    # 0-1-2 chain, 3-4 pair, 5 alone
+    labels = _connected_components(6, np.array([2, 1, 4]), np.array([1, 0, 3]))
+    assert labels.tolist() == [0, 0, 0, 3, 3, 5]
+
+
+@pytest.mark.parametrize("max_distance", [1, 3, 6])
+def test_find_near_duplicate_edges(max_distance):
+    rng = np.random.default_rng(max_distance)
+    hashes = np.unique(make_clustered_hashes(rng, clusters=20, per_cluster=5))
+    edges_a, edges_b = find_near_duplicate_edges(hashes, max_distance, chunk_size=7)
+    found = {(min(a, b), max(a, b)) for a, b in zip(edges_a, edges_b)}
+    expected = {
+        (i, j)
+        for i in range(len(hashes))
+        for j in range(i + 1, len(hashes))
+        if bin(int(hashes[i]) ^ int(hashes[j])).count("1") <= max_distance
+    }
+    assert found == expected
+
+
+@pytest.mark.parametrize("max_distance", [0, 2, 5])
+def test_group_near_duplicates_matches_brute_force(max_distance):
+    rng = np.random.default_rng(42 + max_distance)
+    hashes = make_clustered_hashes(rng, clusters=30, per_cluster=4)
+    hashes = np.concatenate([hashes, hashes[:10]])  # Some exact duplicates
+    groups = list(group_near_duplicates(hashes, max_distance))
+    assert [len(g) for g in groups] == sorted((len(g) for g in groups), reverse=True)
+    assert {frozenset(g.tolist()) for g in groups} == brute_force_groups(
+        hashes,
+        max_distance,
+    )
+
+
+def test_index_save_load_round_trip(tmp_path):
+    from PIL import Image
+
+    builder = IconHashIndexBuilder(hash_kind="phash", batch_size=2)
+    for i, color in enumerate(["red", "blue", "green"]):
+        img = Image.new("RGBA", (16, 16), color)
+        img.paste((255, 255, 255, 0), (0, 0, 4 + i * 4, 8))
+        builder.add(f"file{i % 2}.exe", f"ico_{i}", img)
+    index = builder.build()
+    assert index.files == ["file0.exe", "file1.exe"]
+
+    path = index.save(str(tmp_path / "index"))
+    assert path.endswith(".npz")
+    loaded = IconHashIndex.load(str(tmp_path / "index"))
+    assert loaded.hash_kind == "phash"
+    assert loaded.hashes.tolist() == index.hashes.tolist()
+    assert [loaded.describe(i) for i in range(len(loaded))] == [
+        index.describe(i) for i in range(len(index))
+    ]
+
+    combined = IconHashIndex.concatenate([index, loaded])
+    assert len(combined) == 6
+    assert combined.describe(4) == index.describe(1)
+    with pytest.raises(ValueError):
+        IconHashIndex.concatenate([index, IconHashIndexBuilder("dhash").build()])
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from PIL import Image
+
+from res_extract.images import (
+    decode_image_source,
+    iter_image_sources,
+    iter_images,
+    validate_kinds,
+)
+from res_extract.resources import get_resources_from_file
+
+EXPECTED_NAMES = [
+    "bmp_1",
+    "bmp_2",
+    "ico_10_32x32",
+    "ico_10_16x16",
+    "ico_11_24x24",
+]
+
+
+def read_resources(data: bytes):
+    return list(get_resources_from_file(io.BytesIO(data)))
+
+
+def test_iter_images(ne_exe_data):
+    images = list(iter_images(read_resources(ne_exe_data)))
+    assert [image.name for image in images] == EXPECTED_NAMES
+    assert [image.size for image in images] == [
+        (8, 4),
+        (5, 7),
+        (32, 32),
+        (16, 16),
+        (24, 24),
+    ]
+    for image in images:
+        assert image.image is None
+        assert Image.open(io.BytesIO(image.png)).size == image.size
+
+
+def test_iter_images_kinds(ne_exe_data):
+    images = iter_images(read_resources(ne_exe_data), kinds=("ico",))
+    assert [image.name for image in images] == EXPECTED_NAMES[2:]
+    assert list(iter_images(read_resources(ne_exe_data), kinds=("cur",))) == []
+
+
+def test_decode_image_source_pil(ne_exe_data):
+    source = next(iter_image_sources(read_resources(ne_exe_data), kinds=("bmp",)))
+    (image,) = decode_image_source(source, output="pil")
+    assert image.png is None
+    assert image.image.size == (8, 4)
+    assert image.image.convert("RGB").getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_validation(ne_exe_data):
+    with pytest.raises(ValueError):
+        validate_kinds(["ico", "png"])
+    source = next(iter_image_sources(read_resources(ne_exe_data)))
+    with pytest.raises(ValueError):
+        decode_image_source(source, output="jpeg")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import io
+import struct
+
+import pytest
+
+from res_extract.errors import BadResourceTable
+from res_extract.le_resources import LE_HEADER_SIZE, read_le_resources
+
+PAGE_SIZE = 0x10
+
+
+def make_le_file(
+    *,
+    page_map: bytes = b"",
+    resources: list[tuple[int, int, int, int]] = (),
+    pages: bytes = b"",
+    winres: bytes = b"",
+) -> io.BytesIO:
+    """
+    Build a minimal DOS-stubless LE file with a single object spanning
+    all pages, followed by the given (type_id, res_id, size, offset)
+    resource table, page data and VxD resources.
+    """
+    page_count = len(page_map) // 4
+    object_table_offset = LE_HEADER_SIZE
+    page_map_offset = object_table_offset + 24
+    resource_table_offset = page_map_offset + len(page_map)
+    data_pages_offset = resource_table_offset + 14 * len(resources)
+    winres_offset = data_pages_offset + len(pages)
+
+    header = bytearray(LE_HEADER_SIZE)
+    header[0:2] = b"LE"
+    struct.pack_into("<I", header, 0x14, page_count)
+    struct.pack_into("<I", header, 0x28, PAGE_SIZE)
+    struct.pack_into("<I", header, 0x2C, PAGE_SIZE)  # Bytes on last page
+    struct.pack_into("<II", header, 0x40, object_table_offset, 1)
+    struct.pack_into("<I", header, 0x48, page_map_offset)
+    struct.pack_into("<II", header, 0x50, resource_table_offset, len(resources))
+    struct.pack_into("<I", header, 0x80, data_pages_offset)
+    if winres:
+        struct.pack_into("<II", header, 0xB8, winres_offset, len(winres))
+
+    object_table = struct.pack("<6I", page_count * PAGE_SIZE, 0, 0, 1, page_count, 0)
+    resource_table = b"".join(
+        struct.pack("<HHIHI", type_id, res_id, size, 1, offset)
+        for type_id, res_id, size, offset in resources
+    )
+    return io.BytesIO(
+        bytes(header) + object_table + page_map + resource_table + pages + winres,
+    )
+
+
+def le_page_map_entry(page_number: int, flags: int = 0) -> bytes:
+    return page_number.to_bytes(3, "big") + bytes([flags])
+
+
+def test_le_resource_pages():
+    exe = make_le_file(
+        page_map=le_page_map_entry(1) + le_page_map_entry(0, flags=3),  # Zero-filled
+        resources=[(1, 1, 12, 2), (1, 2, 8, PAGE_SIZE + 4)],
+        pages=bytes(range(PAGE_SIZE)),
+    )
+    first, second = read_le_resources(exe)
+    assert first.exe_format == "LX"
+    assert first.data == bytes(range(2, 14))
+    assert second.data == bytes(8)
+
+
+def test_le_bogus_page_number_skips_resource():
+    exe = make_le_file(
+        page_map=le_page_map_entry(1) + le_page_map_entry(0),
+        resources=[(1, 1, 4, 0), (1, 2, 4, PAGE_SIZE)],
+        pages=bytes(range(PAGE_SIZE)),
+    )
+    (resource,) = read_le_resources(exe)
+    assert resource.res_id == 1
+
+
+def test_vxd_resources():
+    version_data = b"\x12\x34"
+    winres = (
+        b"\xff\x10\x00"  # RT_VERSION
+        + b"\xff\x01\x00"
+        + struct.pack("<HI", 0x30, len(version_data))
+        + version_data
+        + b"\0"
+    )
+    (resource,) = read_le_resources(make_le_file(winres=winres))
+    assert (resource.type_id, resource.res_id) == (16, 1)
+    assert resource.exe_format == "LE"
+    assert resource.data == version_data
+
+
+@pytest.mark.parametrize(
+    "winres",
+    [
+        b"\xff\x10\x00\xff\x01\x00\x30",  # Truncated resource header
+        b"\xff\x10\x00\xff\x01",  # Truncated ordinal
+        b"\xff\x10\x00",  # Missing name
+        b"\xff\x10\x00\xff\x01\x00\x30\x00\x08\x00\x00\x00\x01",  # Truncated data
+    ],
+)
+def test_truncated_vxd_resources(winres):
+    with pytest.raises(BadResourceTable):
+        list(read_le_resources(make_le_file(winres=winres)))
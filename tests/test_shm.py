@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from res_extract.shm import SharedPayloadClient, SharedPayloadPool
+
+
+@pytest.fixture
+def pool():
+    with SharedPayloadPool(segment_size=1024, max_segments=2) as pool:
+        yield pool
+
+
+def make_client(pool: SharedPayloadPool) -> SharedPayloadClient:
+    return SharedPayloadClient(pool.release_queue, max_segments=pool.max_segments)
+
+
+def test_round_trip(pool):
+    client = make_client(pool)
+    handles = [pool.put_bytes(bytes([i]) * (i + 1)) for i in range(10)]
+    for i, handle in enumerate(handles):
+        assert client.read_bytes(handle) == bytes([i]) * (i + 1)
+        client.release(handle)
+    client.close()
+
+
+def test_segment_recycled_once_released(pool):
+    first = pool.put_bytes(b"a" * 100)
+    second = pool.put_bytes(b"b" * 100)
+    assert second.segment == first.segment
+    assert second.offset > first.offset
+    pool.release(first)
+    # Still one live payload in the segment, so it keeps bump-allocating
+    third = pool.put_bytes(b"c" * 100)
+    assert third.segment == first.segment
+    assert third.offset > second.offset
+    pool.release(second)
+    pool.release(third)
+    fourth = pool.put_bytes(b"d" * 100)
+    assert (fourth.segment, fourth.offset) == (first.segment, 0)
+
+
+def test_allocation_blocks_until_released(pool):
+    client = make_client(pool)
+    # Fill both segments
+    held = [pool.put_bytes(b"x" * 1024), pool.put_bytes(b"y" * 1024)]
+    assert len({handle.segment for handle in held}) == 2
+    timer = threading.Timer(0.2, client.release, (held[0],))
+    timer.start()
+    try:
+        handle = pool.put_bytes(b"z" * 1024)
+    finally:
+        timer.join()
+    assert (handle.segment, handle.offset) == (held[0].segment, 0)
+    assert client.read_bytes(handle) == b"z" * 1024
+
+
+def test_outsized_payload_replaces_free_segment(pool):
+    client = make_client(pool)
+    small = [pool.put_bytes(b"x" * 1024), pool.put_bytes(b"y" * 1024)]
+    client.release(small[0])
+    big = pool.put_bytes(b"z" * 4096)
+    assert big.segment not in {handle.segment for handle in small}
+    assert client.read_bytes(big) == b"z" * 4096
+
+
+def test_client_detaches_idle_segments(pool):
+    client = make_client(pool)
+    for size in (1024, 2048, 4096, 8192):
+        # Each payload outgrows the previous segments, replacing one of them
+        handle = pool.put_bytes(b"x" * size)
+        assert client.read_bytes(handle) == b"x" * size
+        client.release(handle)
+        assert client.attached_segments <= pool.max_segments
+    client.close()
+
+
+def test_allocation_times_out_without_releases():
+    with SharedPayloadPool(
+        segment_size=1024,
+        max_segments=1,
+        release_timeout=0.1,
+    ) as pool:
+        pool.put_bytes(b"x" * 1024)
+        with pytest.raises(TimeoutError):
+            pool.put_bytes(b"y")
+
+
+def test_image_round_trip(pool):
+    from PIL import Image
+
+    client = make_client(pool)
+    img = Image.new("RGBA", (7, 5), (1, 2, 3, 4))
+    img.putpixel((6, 4), (9, 8, 7, 6))
+    handle = pool.put_image(img)
+    assert (handle.shape, handle.mode) == ((7, 5), "RGBA")
+    assert handle.length == 7 * 5 * 4
+    copy = client.read_image(handle)
+    client.release(handle)
+    assert (copy.size, copy.mode) == (img.size, img.mode)
+    assert copy.tobytes() == img.tobytes()
+    client.close()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from res_extract.errors import BadStringTable
+from res_extract.resource_types import KnownResourceTypes
+from res_extract.resources import ResourceEntry
+from res_extract.strings import decode_string_table
+
+
+def make_pe_block(strings: list[str]) -> bytes:
+    # u16 length in characters, then UTF-16LE
+    return b"".join(
+        struct.pack("<H", len(s.encode("utf-16le")) // 2) + s.encode("utf-16le")
+        for s in strings
+    )
+
+
+def make_ne_block(strings: list[str], encoding: str = "cp1252") -> bytes:
+    # u8 length in bytes, then ANSI
+    return b"".join(
+        bytes([len(s.encode(encoding))]) + s.encode(encoding) for s in strings
+    )
+
+
+def make_string_table(data: bytes, res_id: int, exe_format: str) -> ResourceEntry:
+    return ResourceEntry(
+        type_id=KnownResourceTypes.RT_STRING,
+        res_id=res_id,
+        lang_id=0,
+        data=data,
+        exe_format=exe_format,
+    )
+
+
+def test_pe_string_table():
+    strings = ["Hello", "", "Wörld 🙂"] + [""] * 12 + ["Last"]
+    table = make_string_table(make_pe_block(strings), res_id=3, exe_format="PE")
+    # Block 3 holds string IDs 32..47; empty slots are omitted
+    assert decode_string_table(table) == {32: "Hello", 34: "Wörld 🙂", 47: "Last"}
+
+
+def test_ne_string_table():
+    table = make_string_table(
+        make_ne_block(["Acmé", "", "Corp"]),
+        res_id=1,
+        exe_format="NE",
+    )
+    assert decode_string_table(table) == {0: "Acmé", 2: "Corp"}
+    assert decode_string_table(table, ne_encoding="cp437") == {0: "AcmΘ", 2: "Corp"}
+
+
+def test_trailing_empty_slots_omitted():
+    # Only 2 of the 16 slots written at all
+    table = make_string_table(make_pe_block(["a", "b"]), res_id=2, exe_format="PE")
+    assert decode_string_table(table) == {16: "a", 17: "b"}
+
+
+@pytest.mark.parametrize(
+    ("data", "exe_format"),
+    [
+        (make_pe_block(["Hello"])[:-2], "PE"),  # Overruns the table
+        (make_pe_block(["Hello"]) + b"\x01", "PE"),  # Truncated length
+        (make_ne_block(["Hello"])[:-1], "NE"),
+    ],
+)
+def test_bad_string_table(data, exe_format):
+    table = make_string_table(data, res_id=1, exe_format=exe_format)
+    with pytest.raises(BadStringTable):
+        decode_string_table(table)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from res_extract.errors import BadVersionInfo
+from res_extract.resource_types import KnownResourceTypes
+from res_extract.resources import ResourceEntry
+from res_extract.version_info import FIXEDFILEINFO_SIGNATURE, parse_version_info
+
+
+def pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def make_node(
+    key: str,
+    value: bytes = b"",
+    children: list[bytes] = (),
+    *,
+    wide: bool,
+    value_length: int | None = None,
+) -> bytes:
+    """
+    Build a version info node.  Wide (PE) nodes have a wType and UTF-16
+    keys; 16-bit (NE) nodes don't, and have ASCII keys.
+    """
+    if value_length is None:
+        value_length = len(value)
+    if wide:
+        header_size = 6
+        key_data = (key + "\0").encode("utf-16le")
+    else:
+        header_size = 4
+        key_data = (key + "\0").encode("ascii")
+    body = pad4(b"\0" * header_size + key_data)[header_size:]
+    body += pad4(value) + b"".join(children)
+    if wide:
+        header = struct.pack("<HHH", header_size + len(body), value_length, 0)
+    else:
+        header = struct.pack("<HH", header_size + len(body), value_length)
+    return header + body
+
+
+def make_fixed_info() -> bytes:
+    return struct.pack(
+        "<13I",
+        FIXEDFILEINFO_SIGNATURE,
+        0x10000,
+        0x00030000,  # 3.0
+        0x0000000A,  # .0.10
+        0x00030000,
+        0x0000000A,
+        0x3F,
+        0,
+        0x40004,  # VOS_NT_WINDOWS32
+        1,  # VFT_APP
+        0,
+        0,
+        0,
+    )
+
+
+def make_version_info(strings: dict[str, str], *, wide: bool) -> bytes:
+    if wide:
+        string_nodes = [
+            # wValueLength counts characters, including the terminator
+            make_node(
+                key,
+                (value + "\0").encode("utf-16le"),
+                wide=True,
+                value_length=len(value) + 1,
+            )
+            for key, value in strings.items()
+        ]
+    else:
+        string_nodes = [
+            make_node(key, (value + "\0").encode("cp1252"), wide=False)
+            for key, value in strings.items()
+        ]
+    return make_node(
+        "VS_VERSION_INFO",
+        make_fixed_info(),
+        [
+            make_node(
+                "StringFileInfo",
+                children=[make_node("040904E4", children=string_nodes, wide=wide)],
+                wide=wide,
+            ),
+            make_node(
+                "VarFileInfo",
+                children=[
+                    make_node(
+                        "Translation",
+                        struct.pack("<HH", 0x409, 1252),
+                        wide=wide,
+                    ),
+                ],
+                wide=wide,
+            ),
+        ],
+        wide=wide,
+    )
+
+
+def make_resource(data: bytes, exe_format: str) -> ResourceEntry:
+    return ResourceEntry(
+        type_id=KnownResourceTypes.RT_VERSION,
+        res_id=1,
+        lang_id=0,
+        data=data,
+        exe_format=exe_format,
+    )
+
+
+@pytest.mark.parametrize("exe_format", ["PE", "NE"])
+def test_version_info(exe_format):
+    data = make_version_info(
+        {"CompanyName": "Acmé Corp", "FileVersion": "3.0"},
+        wide=(exe_format == "PE"),
+    )
+    info = parse_version_info(make_resource(data, exe_format))
+    assert info["fixed"]["file_version"] == "3.0.0.10"
+    assert info["fixed"]["file_type"] == 1
+    assert info["strings"] == {
+        "040904E4": {"CompanyName": "Acmé Corp", "FileVersion": "3.0"},
+    }
+    assert info["translations"] == [[0x409, 1252]]
+
+
+def test_bad_root_key():
+    data = make_node("VS_VERSION_INFX", make_fixed_info(), wide=True)
+    with pytest.raises(BadVersionInfo):
+        parse_version_info(make_resource(data, "PE"))
+
+
+def test_bad_fixed_info_signature():
+    data = make_node("VS_VERSION_INFO", b"\0" * 52, wide=True)
+    with pytest.raises(BadVersionInfo):
+        parse_version_info(make_resource(data, "PE"))
+
+
+def test_truncated_version_info():
+    data = make_version_info({"FileVersion": "3.0"}, wide=True)
+    # Cut in the middle of the StringFileInfo node's header, which
+    # follows the 40-byte root header and 52-byte VS_FIXEDFILEINFO
+    with pytest.raises(BadVersionInfo):
+        parse_version_info(make_resource(data[:95], "PE"))
+
+
+def test_deeply_nested_version_info():
+    node = make_node("x", wide=False)
+    for _ in range(2000):
+        node = make_node("x", children=[node], wide=False)
+    data = make_node("VS_VERSION_INFO", children=[node], wide=False)
+    with pytest.raises(BadVersionInfo):
+        parse_version_info(make_resource(data, "NE"))